@@ -3,9 +3,15 @@ from dash import dcc, html, Input, Output, callback, State
 import dash_mantine_components as dmc
 from dash_iconify import DashIconify
 import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
 from plotly.subplots import make_subplots
+import flask
 import pandas as pd
 import numpy as np
+import functools
+import json
+import importlib.util
+import os
 from datetime import datetime
 
 # ============================================================================
@@ -55,34 +61,59 @@ def get_color_sequence(chart_type, n_colors=1, is_comparison=False):
 # ============================================================================
 # INITIALIZATION
 # ============================================================================
-app = dash.Dash(__name__)
+# Gzip/brotli the layout, figure and asset responses whenever flask-compress (dash[compress]) is installed
+app = dash.Dash(__name__, compress=importlib.util.find_spec('flask_compress') is not None)
+# WSGI entry point: `gunicorn application:server --preload` loads the data once and shares it copy-on-write across workers
+server = app.server
 
 # ============================================================================
 # DATA LOADING
 # ============================================================================
+_METRIC_COLS = ['Amount_total', 'Amount_1', 'Amount_2', 'Amount_3', 'Income_total', 'Income_1', 'Income_2', 'Income_3']
+_GROUP_COLS = ['Division', 'Type', 'Item', 'Function']
+
+
+def _sort_by_date(df):
+    """Stable-sort rows by their integer timestamps, skipping the sort when already ordered."""
+    stamps = df['date'].to_numpy().view('i8')
+    if (stamps[1:] >= stamps[:-1]).all():
+        return df.reset_index(drop=True)
+    return df.take(np.argsort(stamps, kind='stable')).reset_index(drop=True)
+
+
 try:
-    sample_data = pd.read_csv('Example_df.csv')
-    sample_data['Date'] = pd.to_datetime(sample_data['Date'], format='%Y-%m')
+    # Parse straight into explicit dtypes so read_csv skips type inference: float64 metrics, categorical grouping columns
+    sample_data = pd.read_csv('Example_df.csv', parse_dates=['Date'], date_format='%Y-%m',
+        dtype={**dict.fromkeys(_METRIC_COLS, np.float64), **dict.fromkeys(_GROUP_COLS, 'category')})
     sample_data = sample_data.rename(columns={'Date': 'date'})
-    sample_data = sample_data.sort_values('date').reset_index(drop=True)
+    sample_data = _sort_by_date(sample_data)
+    # The import-time rollups below sum these exact float64 values; the per-request paths then work on
+    # display-only float32 metrics (half the bytes per slice/sum)
+    _METRICS_F64 = sample_data[_METRIC_COLS]
+    sample_data = sample_data.astype(dict.fromkeys(_METRIC_COLS, np.float32))
+    # read_csv sorts the categories; marking them ordered lets groupbys index by code instead of hashing strings,
+    # with .cat.categories already the sorted category list
+    for _col in _GROUP_COLS:
+        sample_data[_col] = sample_data[_col].cat.as_ordered()
     print(f"Successfully loaded {len(sample_data)} records from Example_df.csv")
 
-    tool_sample = pd.read_csv('Example_correction.csv')
-    tool_sample['Date'] = pd.to_datetime(tool_sample['Date'], format='%Y-%m')
+    # The side tables get the same treatment: float32 metrics and categorical labels for filtering/grouping
+    tool_sample = pd.read_csv('Example_correction.csv', parse_dates=['Date'], date_format='%Y-%m',
+        dtype={'Income_corr': np.float32, **dict.fromkeys(['Division', 'Item', 'Function'], 'category')})
     tool_sample = tool_sample.rename(columns={'Date': 'date'})
-    tool_sample = tool_sample.sort_values('date').reset_index(drop=True)
+    tool_sample = _sort_by_date(tool_sample)
     print(f"Successfully loaded {len(tool_sample)} records from Example_correction.csv")
 
-    scenw_sample = pd.read_csv('Example_scenw.csv')
-    scenw_sample['Date'] = pd.to_datetime(scenw_sample['Date'], format='%Y-%m')
+    scenw_sample = pd.read_csv('Example_scenw.csv', parse_dates=['Date'], date_format='%Y-%m', dtype={'ScenName': 'category', 'Weight': np.float32})
     scenw_sample = scenw_sample.rename(columns={'Date': 'date', 'Name': 'ScenName'})
-    scenw_sample = scenw_sample.sort_values('date').reset_index(drop=True)
+    scenw_sample = _sort_by_date(scenw_sample)
     print(f"Successfully loaded {len(scenw_sample)} records from Example_scenw.csv")
 
-    type_sample = pd.read_csv('Type_detail.csv')
-    type_sample['Date'] = pd.to_datetime(type_sample['Date'], format='%Y-%m')
+    type_sample = pd.read_csv('Type_detail.csv', parse_dates=['Date'], date_format='%Y-%m',
+        dtype={**dict.fromkeys(['WW_Income', 'DP_Income', 'WW_Amount', 'DP_Amount'], np.float32),
+               **dict.fromkeys(['Group', 'Division', 'Function'], 'category')})
     type_sample = type_sample.rename(columns={'Date': 'date'})
-    type_sample = type_sample.sort_values('date').reset_index(drop=True)
+    type_sample = _sort_by_date(type_sample)
     print(f"Successfully loaded {len(type_sample)} records from Type_detail.csv")
 
 except FileNotFoundError:
@@ -95,9 +126,71 @@ min_year = sample_data['date'].dt.year.min()
 max_year = sample_data['date'].dt.year.max()
 year_marks = {year: {'label': str(year)} for year in range(min_year, max_year + 1)}
 
+# Grouping/filter columns the UI may select, intersected with the loaded columns once so each check is one set lookup
+_VALID_GROUPS = frozenset(_GROUP_COLS) & frozenset(sample_data.columns)
+
+# Filter MultiSelect data per grouping column, built once: options come from the already-sorted categories,
+# the default selection keeps the original first-appearance order
+_FILTER_OPTIONS = {col: ([{"value": val, "label": val} for val in sample_data[col].cat.categories], list(sample_data[col].unique()))
+    for col in _VALID_GROUPS}
+
+# Comparison date options never change at runtime, so they are built once and shipped with the layout;
+# np.unique on month-resolution datetimes returns them sorted and str() gives the 'YYYY-MM' values
+_COMPARISON_DATE_OPTIONS = [{"value": d, "label": d} for d in np.unique(sample_data['date'].to_numpy().astype('datetime64[M]')).astype(str).tolist()]
+
+# 'YYYY-MM' key of every row, formatted once per table so no request converts dates to months again
+_MONTH_KEY = sample_data['date'].dt.strftime('%Y-%m').rename('month')
+_TOOL_MONTH_KEY = tool_sample['date'].dt.strftime('%Y-%m').rename('month')
+_SCENW_MONTH_KEY = scenw_sample['date'].dt.strftime('%Y-%m').rename('month')
+
+# Monthly slices of sample_data keyed by 'YYYY-MM' for O(1) lookup of a selected month
+_MONTHLY_GROUPS = dict(tuple(sample_data.groupby(_MONTH_KEY, sort=False)))
+_EMPTY_MONTH = sample_data.iloc[0:0]
+
+# Rollups group the float64 metrics kept at load: a float32 groupby-sum returns float32, whose step near
+# the monthly totals is large enough to change the displayed first decimal
+_ROLLUP_FRAME = _METRICS_F64.join(sample_data[_GROUP_COLS])
+
+# Per-month metric sums, overall and split by each filter dimension, so comparison totals
+# are a pivot lookup instead of a groupby at request time
+_MONTHLY_PIVOTS = {'_all': _ROLLUP_FRAME.groupby(_MONTH_KEY)[_METRIC_COLS].sum()}
+for _dim in _GROUP_COLS:
+    _MONTHLY_PIVOTS[_dim] = _ROLLUP_FRAME.groupby([_MONTH_KEY, _dim], observed=True)[_METRIC_COLS].sum().unstack(_dim, fill_value=0)
+
+# The same sums in long form, keeping only the (month, category) pairs that have rows, so a filtered
+# History rollup has exactly the months the raw rows would produce
+_MONTHLY_ROLLUPS = {_dim: _ROLLUP_FRAME.groupby([_MONTH_KEY, _dim], observed=True)[_METRIC_COLS].sum() for _dim in _GROUP_COLS}
+# ...and per (filter dimension, breakdown dimension) pair, so a filter on one column with a stack/group on another
+# is a rollup slice too
+_PAIR_ROLLUPS = {(_f, _g): _ROLLUP_FRAME.groupby([_MONTH_KEY, _f, _g], observed=True)[_METRIC_COLS].sum()
+    for _f in _GROUP_COLS for _g in _GROUP_COLS if _f != _g}
+
+# Scenario weights summed per (month, scenario) once; the Scenario tab only slices them by year
+_SCENARIO_WEIGHTS = scenw_sample.groupby([_SCENW_MONTH_KEY, 'ScenName'], observed=True)['Weight'].sum()
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
+# Fixed parts of the comparison chart layouts, validated once at import; each figure only sets its title and axes
+_COMPARISON_BAR_LAYOUT = go.Layout(template="plotly_white", height=300, showlegend=True, xaxis=dict(type='category'))
+# Serialized once (template included) so comparison bars can be returned as plain dicts without per-figure validation;
+# set DASH_VALIDATE=1 to route them through go.Figure while developing
+_COMPARISON_BAR_LAYOUT_JSON = _COMPARISON_BAR_LAYOUT.to_plotly_json()
+_VALIDATE_FIGURES = bool(os.getenv('DASH_VALIDATE'))
+
+
+def plain_figure(fig):
+    """JSON round-trip a Figure or figure dict into plain lists/dicts/floats for caching, so each response
+    serializes without the encoder's per-object fallbacks for numpy and pandas values"""
+    return json.loads(to_json_plotly(fig))
+
+_DUMBBELL_LAYOUT_JSON = go.Layout(xaxis_title="Proportion (%)", template="plotly_white", height=350, showlegend=True,
+    margin=dict(l=100, r=50, t=80, b=50)).to_plotly_json()
+_HISTORY_BAR_LAYOUT_JSON = go.Layout(xaxis=dict(title=dict(text="Month"), tickangle=45), template="plotly_white",
+    showlegend=True, height=350, margin=dict(l=50, r=50, t=60, b=50)).to_plotly_json()
+_DIVISION_LAYOUT = go.Layout(xaxis_title="Month", yaxis_title="Percentage (%)", barmode='stack', template="plotly_white",
+    height=350, showlegend=True, yaxis=dict(range=[0, 100]))
+
 def format_number(value):
     """Format numbers to billions, millions, or thousands"""
     if abs(value) >= 1e8:
@@ -120,20 +213,160 @@ def format_hover_value(value):
     else:
         return f"{value:.3f}"
 
+_NUMBER_SCALES = np.array([1e9, 1e6, 1e3, 1.0])
+_NUMBER_SUFFIXES = np.array(['B', 'M', 'K', ''])
+
+def format_numbers(values, decimals=2):
+    """Vectorized format_number (decimals=3 matches format_hover_value) using one np.char.mod pass"""
+    values = np.asarray(values)
+    if values.dtype.kind != 'f':
+        values = values.astype(np.float64)
+    magnitude = np.abs(values)
+    tier = np.select([magnitude >= 1e8, magnitude >= 1e5, magnitude >= 1e2], [0, 1, 2], default=3)
+    scaled = values / _NUMBER_SCALES[tier].astype(values.dtype)
+    return np.char.add(np.char.mod(f'%.{decimals}f', scaled), _NUMBER_SUFFIXES[tier]).tolist()
+
+
+# Best = Type1 + Type2
+_BEST_COMPONENTS = {'Amount_Best': ['Amount_1', 'Amount_2'], 'Income_Best': ['Income_1', 'Income_2']}
+
+def monthly_total(month, col, filter_var="none", filter_values=None):
+    """Sum of a metric for one 'YYYY-MM' month, read from the precomputed monthly pivots"""
+    cols = _BEST_COMPONENTS.get(col, [col])
+    if filter_var != "none" and filter_values and filter_var in _MONTHLY_PIVOTS:
+        pivot = _MONTHLY_PIVOTS[filter_var]
+        if month not in pivot.index:
+            return 0
+        row = pivot.loc[month]
+        return float(sum(row[c].reindex(filter_values, fill_value=0).sum() for c in cols))
+    pivot = _MONTHLY_PIVOTS['_all']
+    if month not in pivot.index:
+        return 0
+    return float(pivot.loc[month, cols].sum())
+
+
+def monthly_rollup(cols, year_range, filter_var="none", filter_values=None):
+    """Per-month sums of the given metrics within the year range, read from the precomputed monthly rollups"""
+    rollup = _filtered_monthly_rollup(tuple(year_range), filter_var, tuple(filter_values or ()))
+    return pd.DataFrame({col: rollup[_BEST_COMPONENTS.get(col, [col])].sum(axis=1) for col in cols})
+
+
+# The filter/year slice covers every metric column, so the History summary, its charts and every display type
+# share one slice per filter change and only pick columns from it; the cached frames must not be mutated
+@functools.lru_cache(maxsize=64)
+def _filtered_monthly_rollup(year_range, filter_var, filter_values):
+    if filter_var in _MONTHLY_ROLLUPS and filter_values:
+        rollup = _MONTHLY_ROLLUPS[filter_var]
+        rollup = rollup[rollup.index.get_level_values(filter_var).isin(filter_values)].groupby(level=0).sum()
+    else:
+        rollup = _MONTHLY_PIVOTS['_all']
+    years = rollup.index.str[:4].astype(int)
+    return rollup[(years >= year_range[0]) & (years <= year_range[1])]
+
+
+def category_monthly_rollup(cols, dim, year_range, filter_var="none", filter_values=None):
+    """Long-form (month, category) sums of the given metrics for one grouping dimension, read from the precomputed rollups"""
+    rollup = _filtered_category_rollup(dim, tuple(year_range), filter_var, tuple(filter_values or ()))
+    return pd.DataFrame({col: rollup[_BEST_COMPONENTS.get(col, [col])].sum(axis=1) for col in cols}, index=rollup.index)
+
+
+@functools.lru_cache(maxsize=64)
+def _filtered_category_rollup(dim, year_range, filter_var, filter_values):
+    filtered = filter_var in _MONTHLY_ROLLUPS and filter_values
+    if filtered and filter_var != dim:
+        rollup = _PAIR_ROLLUPS[(filter_var, dim)]
+        rollup = rollup[rollup.index.get_level_values(filter_var).isin(filter_values)]
+        rollup = rollup.groupby(level=['month', dim], observed=True).sum()
+    else:
+        rollup = _MONTHLY_ROLLUPS[dim]
+        if filtered:
+            rollup = rollup[rollup.index.get_level_values(dim).isin(filter_values)]
+    years = rollup.index.get_level_values(0).str[:4].astype(int)
+    return rollup[(years >= year_range[0]) & (years <= year_range[1])]
+
+
+@functools.lru_cache(maxsize=256)
+def _delta_card(label, change_text, is_positive, detail_text):
+    """Build a comparison metric card; keyed on the already-rounded display strings so repeat states hit the cache"""
+    color = "green" if is_positive else "red"
+    return dmc.Card([dmc.Stack([dmc.Text(label, size="sm", c="dimmed"),
+        dmc.Group([dmc.Text(change_text, size="xl", fw=700, c=color),
+            DashIconify(icon="material-symbols:trending-up" if is_positive else "material-symbols:trending-down", width=24, color=color)],
+            justify="space-between", align="center"),
+        dmc.Text(detail_text, size="xs", c="dimmed")], gap="xs")], withBorder=True, shadow="sm", radius="md", p="md")
+
+
+def rows_for_date(df, date):
+    """Rows of a date-sorted frame whose 'date' equals date, as a positional slice (no boolean mask or copy)"""
+    dates = df['date']
+    return df.iloc[dates.searchsorted(date, side='left'):dates.searchsorted(date, side='right')]
+
+
+def rows_for_years(df, year_range):
+    """Rows of a date-sorted frame within an inclusive year range, as a positional slice (no .dt.year mask)"""
+    dates = df['date']
+    return df.iloc[dates.searchsorted(pd.Timestamp(int(year_range[0]), 1, 1)):dates.searchsorted(pd.Timestamp(int(year_range[1]) + 1, 1, 1))]
+
+
+def get_tool_monthly(division_filter, item_filter, function_filter, year_range):
+    """
+    Monthly original income and income corrections for the Tool tab selection, shared by its chart and export
+    Returns: tuple of (main_agg, corr_agg, merged); the frames are cached and must be treated as read-only
+    """
+    return _get_tool_monthly_cached(division_filter, item_filter, function_filter, tuple(year_range))
+
+
+@functools.lru_cache(maxsize=32)
+def _get_tool_monthly_cached(division_filter, item_filter, function_filter, year_range):
+    # Filter sample_data
+    df_main = rows_for_years(sample_data, year_range)
+    if division_filter != "none":
+        df_main = df_main[df_main['Division'] == division_filter]
+    if item_filter != "none":
+        df_main = df_main[df_main['Item'] == item_filter]
+    if function_filter != "none":
+        df_main = df_main[df_main['Function'] == function_filter]
+    
+    # Filter tool_sample
+    df_corr = rows_for_years(tool_sample, year_range)
+    if division_filter != "none":
+        df_corr = df_corr[df_corr['Division'] == division_filter]
+    if item_filter != "none":
+        df_corr = df_corr[df_corr['Item'] == item_filter]
+    if function_filter != "none":
+        df_corr = df_corr[df_corr['Function'] == function_filter]
+    
+    # Aggregate by month on the precomputed keys (every date is a month start)
+    main_agg = df_main.groupby(_MONTH_KEY.loc[df_main.index])['Income_total'].sum().reset_index()
+    corr_agg = df_corr.groupby(_TOOL_MONTH_KEY.loc[df_corr.index])['Income_corr'].sum().reset_index()
+    
+    # Merge the two datasets
+    merged = pd.merge(main_agg[['month', 'Income_total']], corr_agg[['month', 'Income_corr']], 
+                     on='month', how='outer').fillna(0)
+    merged = merged.sort_values('month')
+    return main_agg, corr_agg, merged
+
 
 def prepare_type_breakdown_data(date1, date2, filter_var, filter_values, group_var):
     """
     Prepare combined data with WW, DP, and PP breakdowns for comparison
     Returns: tuple of (df_date1, df_date2, group_cols) or (None, None, None) if error
     """
+    # Independent of the display type, so type toggles and the text/chart callbacks share one aggregation;
+    # the returned frames are cached and must be treated as read-only
+    return _prepare_type_breakdown_cached(date1, date2, filter_var, tuple(filter_values or ()), group_var)
+
+
+@functools.lru_cache(maxsize=32)
+def _prepare_type_breakdown_cached(date1, date2, filter_var, filter_values, group_var):
     try:
         # Get type_sample data for both dates
-        type_date1 = type_sample[type_sample['date'] == date1].copy()
-        type_date2 = type_sample[type_sample['date'] == date2].copy()
+        type_date1 = rows_for_date(type_sample, date1)
+        type_date2 = rows_for_date(type_sample, date2)
         
-        # Get sample_data for both dates (for Type2 = Amount_2 and Income_2)
-        sample_date1 = sample_data[sample_data['date'] == date1].copy()
-        sample_date2 = sample_data[sample_data['date'] == date2].copy()
+        # Get sample_data for both dates (for Type2 = Amount_2 and Income_2) from the monthly partitions
+        sample_date1 = _MONTHLY_GROUPS.get(date1.strftime('%Y-%m'), _EMPTY_MONTH)
+        sample_date2 = _MONTHLY_GROUPS.get(date2.strftime('%Y-%m'), _EMPTY_MONTH)
         
         # Apply filters if specified
         if filter_var != "none" and filter_values:
@@ -146,14 +379,14 @@ def prepare_type_breakdown_data(date1, date2, filter_var, filter_values, group_v
         
         # Determine grouping columns
         group_cols = []
-        if group_var != "none" and group_var in ['Division', 'Function', 'Type', 'Item']:
+        if group_var in _VALID_GROUPS:
             group_cols = [group_var]
         
         # Process each date
         def process_date(type_df, sample_df, group_cols):
             if group_cols:
                 # Aggregate type_sample by group
-                type_agg = type_df.groupby(group_cols).agg({
+                type_agg = type_df.groupby(group_cols, observed=True).agg({
                     'WW_Amount': 'sum',
                     'DP_Amount': 'sum',
                     'WW_Income': 'sum',
@@ -161,7 +394,7 @@ def prepare_type_breakdown_data(date1, date2, filter_var, filter_values, group_v
                 }).reset_index()
                 
                 # Aggregate sample_data by group (Type2 components)
-                sample_agg = sample_df.groupby(group_cols).agg({
+                sample_agg = sample_df.groupby(group_cols, observed=True).agg({
                     'Amount_2': 'sum',
                     'Income_2': 'sum'
                 }).reset_index()
@@ -198,9 +431,48 @@ def prepare_type_breakdown_data(date1, date2, filter_var, filter_values, group_v
         return None, None, None
 
 
+def share_change_lines(agg, col, with_amounts=False):
+    """Bullet lines of each category's share of col in both months, formatted column-wise rather than per category"""
+    values1, values2 = agg[(col, 0)].to_numpy(), agg[(col, 1)].to_numpy()
+    total1, total2 = values1.sum(), values2.sum()
+    if not (total1 > 0 or total2 > 0):
+        return []
+    shares1 = values1 / total1 * 100 if total1 > 0 else np.zeros(len(values1))
+    shares2 = values2 / total2 * 100 if total2 > 0 else np.zeros(len(values2))
+    change = shares2 - shares1
+    change_desc = np.where(change > 0, "increased", np.where(change < 0, "decreased", "remained stable")).astype(object)
+    lines = ("• " + agg.index.astype(str).to_numpy(dtype=object) + ": " + np.char.mod('%.1f', shares1).astype(object) + "% → "
+        + np.char.mod('%.1f', shares2).astype(object) + "% (" + change_desc + " by " + np.char.mod('%.1f', np.abs(change)).astype(object) + "pp)")
+    if with_amounts:
+        lines = lines + ", amounts: " + np.array(format_numbers(values1), dtype=object) + " → " + np.array(format_numbers(values2), dtype=object)
+    return (lines + "\n").tolist()
+
+
+def type2_change_lines(type_df1, type_df2, group_var, components):
+    """Per-group component change lines for groups present in both months, paired by one merge instead of a mask per group"""
+    paired = type_df1[[group_var, *components]].merge(
+        type_df2[[group_var, *components]].drop_duplicates(group_var), on=group_var, suffixes=('_1', '_2'))
+    lines = [[f"\n{group}:\n"] for group in paired[group_var]]
+    for component in components:
+        val1, val2 = paired[f"{component}_1"].to_numpy(), paired[f"{component}_2"].to_numpy()
+        change = val2 - val1
+        pct_change = np.abs(np.divide(change, val1, out=np.zeros_like(change), where=val1 != 0) * 100)
+        change_desc = np.where(change > 0, "increased", np.where(change < 0, "decreased", "unchanged"))
+        tails = np.where(pct_change > 0.01, np.char.mod(" by %.1f%%)\n", pct_change), ")\n")
+        for parts, text1, text2, desc, tail in zip(lines, format_numbers(val1), format_numbers(val2), change_desc, tails):
+            parts.append(f"  • {component}: {text1} → {text2} ({desc}{tail}")
+    return [part for parts in lines for part in parts]
+
+
 def generate_enhanced_comparison_text_updated(amount_old, amount_new, income_old, income_new, date1, date2, 
-                                            filter_var, filter_values, group_var, df1, df2, selected_type, amount_col, income_col):
+                                            filter_var, filter_values, group_var, df1, df2, selected_type, amount_col, income_col,
+                                            comparison_agg=None):
     """Generate comprehensive comparison analysis text"""
+    # comparison_agg(category_col) returns the two-month amount/income sums per category; callers holding a cached
+    # aggregate (shared with the charts) pass it in, otherwise it is computed from df1/df2
+    if comparison_agg is None:
+        comparison_agg = lambda category_col: compute_comparison_agg(df1, df2, category_col, [amount_col, income_col])
+
     def create_change_sentence(variable, old_val, new_val, date1, date2):
         if abs((new_val - old_val) / old_val) < 0.01 if old_val != 0 else abs(new_val) < 0.01:
             change_type = "remained essentially equal"
@@ -238,53 +510,31 @@ def generate_enhanced_comparison_text_updated(amount_old, amount_new, income_old
     # Determine which grouping variable to analyze (default to Item if none selected)
     analysis_group_var = group_var if group_var != "none" else "Function"
     
-    if analysis_group_var in ['Division', 'Type', 'Item', 'Function'] and not df1.empty and not df2.empty:
+    if analysis_group_var in _VALID_GROUPS and not df1.empty and not df2.empty:
         text_parts.append(f"PROPORTION ANALYSIS BY {analysis_group_var.upper()}:\n" + "=" * 30 + "\n\n")
         
+        # Both months and both variables in one pass; the index is the sorted union of groups
+        group_agg = comparison_agg(analysis_group_var)
         for col, label in [(amount_col, "Amount"), (income_col, "Income")]:
-            groups1 = df1.groupby(analysis_group_var)[col].sum()
-            total1 = df1[col].sum()
-            props1 = (groups1 / total1 * 100) if total1 > 0 else pd.Series(dtype=float)
-            
-            groups2 = df2.groupby(analysis_group_var)[col].sum()
-            total2 = df2[col].sum()
-            props2 = (groups2 / total2 * 100) if total2 > 0 else pd.Series(dtype=float)
-            
             text_parts.append(f"{label} ({selected_type}) Proportion Changes by {analysis_group_var}:\n")
-            for group in sorted(set(props1.index) | set(props2.index)):
-                prop1, prop2 = props1.get(group, 0), props2.get(group, 0)
-                amt1, amt2 = groups1.get(group, 0), groups2.get(group, 0)
-                prop_change = prop2 - prop1
-                change_desc = "increased" if prop_change > 0 else "decreased" if prop_change < 0 else "remained stable"
-                text_parts.append(f"• {group}: {prop1:.1f}% → {prop2:.1f}% ({change_desc} by {abs(prop_change):.1f}pp), amounts: {format_number(amt1)} → {format_number(amt2)}\n")
+            text_parts.extend(share_change_lines(group_agg, col, with_amounts=True))
             text_parts.append("\n")
     
     # Always analyze Division contribution (stacked bar chart)
     if 'Division' in df1.columns and 'Division' in df2.columns and not df1.empty and not df2.empty:
         text_parts.append("DIVISION PERCENTAGE CONTRIBUTION:\n" + "=" * 30 + "\n\n")
         
+        division_agg = comparison_agg('Division')
         for col, label in [(amount_col, "Amount"), (income_col, "Income")]:
-            div1 = df1.groupby('Division')[col].sum()
-            total1 = div1.sum()
-            pct1 = (div1 / total1 * 100) if total1 > 0 else pd.Series(dtype=float)
-            
-            div2 = df2.groupby('Division')[col].sum()
-            total2 = div2.sum()
-            pct2 = (div2 / total2 * 100) if total2 > 0 else pd.Series(dtype=float)
-            
             text_parts.append(f"{label} ({selected_type}) Division Contribution:\n")
-            for division in sorted(set(pct1.index) | set(pct2.index)):
-                p1, p2 = pct1.get(division, 0), pct2.get(division, 0)
-                pct_change = p2 - p1
-                change_desc = "increased" if pct_change > 0 else "decreased" if pct_change < 0 else "remained stable"
-                text_parts.append(f"• {division}: {p1:.1f}% → {p2:.1f}% ({change_desc} by {abs(pct_change):.1f}pp)\n")
+            text_parts.extend(share_change_lines(division_agg, col))
             text_parts.append("\n")
     
     # Add Tool Sample (Income Correction) Analysis
     try:
         # Filter tool_sample data for the same date range and criteria
-        tool_date1 = tool_sample[tool_sample['date'] == date1].copy()
-        tool_date2 = tool_sample[tool_sample['date'] == date2].copy()
+        tool_date1 = rows_for_date(tool_sample, date1)
+        tool_date2 = rows_for_date(tool_sample, date2)
         
         # Apply same filtering criteria
         if filter_var != "none" and filter_values and filter_var in tool_date1.columns:
@@ -294,9 +544,10 @@ def generate_enhanced_comparison_text_updated(amount_old, amount_new, income_old
         if not tool_date1.empty or not tool_date2.empty:
             text_parts.append("INCOME CORRECTION ANALYSIS (Tool Data):\n" + "=" * 30 + "\n\n")
             
-            # Total income corrections
-            corr_total1 = tool_date1['Income_corr'].sum() if not tool_date1.empty else 0
-            corr_total2 = tool_date2['Income_corr'].sum() if not tool_date2.empty else 0
+            # Total income corrections, reduced on the raw arrays rather than through Series.sum dispatch; accumulated
+            # in float64 so the float32 column formats like the exact totals
+            corr_total1 = tool_date1['Income_corr'].to_numpy().sum(dtype=np.float64) if not tool_date1.empty else 0
+            corr_total2 = tool_date2['Income_corr'].to_numpy().sum(dtype=np.float64) if not tool_date2.empty else 0
             
             if corr_total1 > 0 or corr_total2 > 0:
                 corr_change = corr_total2 - corr_total1
@@ -313,12 +564,12 @@ def generate_enhanced_comparison_text_updated(amount_old, amount_new, income_old
                 if 'Function' in tool_date1.columns or 'Function' in tool_date2.columns:
                     text_parts.append("Income Correction by Function:\n")
                     
-                    func1 = tool_date1.groupby('Function')['Income_corr'].sum() if not tool_date1.empty and 'Function' in tool_date1.columns else pd.Series(dtype=float)
-                    func2 = tool_date2.groupby('Function')['Income_corr'].sum() if not tool_date2.empty and 'Function' in tool_date2.columns else pd.Series(dtype=float)
-                    
-                    all_functions = sorted(set(func1.index) | set(func2.index))
-                    for function in all_functions:
-                        f1, f2 = func1.get(function, 0), func2.get(function, 0)
+                    # Both months in one bincount pass, indexed by the sorted union of observed functions
+                    func_agg = compute_comparison_agg(tool_date1, tool_date2, 'Function', ['Income_corr'])
+                    all_functions = func_agg.index.tolist()
+                    values1 = func_agg[('Income_corr', 0)].to_numpy()
+                    values2 = func_agg[('Income_corr', 1)].to_numpy()
+                    for function, f1, f2 in zip(all_functions, values1, values2):
                         f_change = f2 - f1
                         f_pct_change = (f_change / f1 * 100) if f1 != 0 else (100 if f2 > 0 else 0)
                         f_change_desc = "increased" if f_change > 0 else "decreased" if f_change < 0 else "remained stable"
@@ -336,8 +587,8 @@ def generate_enhanced_comparison_text_updated(amount_old, amount_new, income_old
     # Add Scenario Weight Analysis
     try:
         # Filter scenw_sample data for the two comparison dates
-        scenw_date1 = scenw_sample[scenw_sample['date'] == date1].copy()
-        scenw_date2 = scenw_sample[scenw_sample['date'] == date2].copy()
+        scenw_date1 = rows_for_date(scenw_sample, date1)
+        scenw_date2 = rows_for_date(scenw_sample, date2)
         
         if not scenw_date1.empty or not scenw_date2.empty:
             text_parts.append("SCENARIO WEIGHT ANALYSIS:\n" + "=" * 30 + "\n\n")
@@ -387,23 +638,7 @@ def generate_enhanced_comparison_text_updated(amount_old, amount_new, income_old
             # Amount breakdown
             if type_group_cols:
                 text_parts.append(f"Amount Breakdown by {group_var}:\n")
-                for idx, row1 in type_df1.iterrows():
-                    group_val = row1[group_var]
-                    row2 = type_df2[type_df2[group_var] == group_val]
-                    
-                    if not row2.empty:
-                        row2 = row2.iloc[0]
-                        text_parts.append(f"\n{group_val}:\n")
-                        for component in ['WW_Amount', 'DP_Amount', 'PP_Amount']:
-                            val1, val2 = row1[component], row2[component]
-                            change = val2 - val1
-                            pct_change = (change / val1 * 100) if val1 != 0 else 0
-                            change_desc = "increased" if change > 0 else "decreased" if change < 0 else "unchanged"
-                            text_parts.append(f"  • {component}: {format_number(val1)} → {format_number(val2)} ({change_desc}")
-                            if abs(pct_change) > 0.01:
-                                text_parts.append(f" by {abs(pct_change):.1f}%)\n")
-                            else:
-                                text_parts.append(")\n")
+                text_parts.extend(type2_change_lines(type_df1, type_df2, group_var, ['WW_Amount', 'DP_Amount', 'PP_Amount']))
             else:
                 text_parts.append("Amount Breakdown Total:\n")
                 row1, row2 = type_df1.iloc[0], type_df2.iloc[0]
@@ -422,23 +657,7 @@ def generate_enhanced_comparison_text_updated(amount_old, amount_new, income_old
             # Income breakdown
             if type_group_cols:
                 text_parts.append(f"Income Breakdown by {group_var}:\n")
-                for idx, row1 in type_df1.iterrows():
-                    group_val = row1[group_var]
-                    row2 = type_df2[type_df2[group_var] == group_val]
-                    
-                    if not row2.empty:
-                        row2 = row2.iloc[0]
-                        text_parts.append(f"\n{group_val}:\n")
-                        for component in ['WW_Income', 'DP_Income', 'PP_Income']:
-                            val1, val2 = row1[component], row2[component]
-                            change = val2 - val1
-                            pct_change = (change / val1 * 100) if val1 != 0 else 0
-                            change_desc = "increased" if change > 0 else "decreased" if change < 0 else "unchanged"
-                            text_parts.append(f"  • {component}: {format_number(val1)} → {format_number(val2)} ({change_desc}")
-                            if abs(pct_change) > 0.01:
-                                text_parts.append(f" by {abs(pct_change):.1f}%)\n")
-                            else:
-                                text_parts.append(")\n")
+                text_parts.extend(type2_change_lines(type_df1, type_df2, group_var, ['WW_Income', 'DP_Income', 'PP_Income']))
             else:
                 text_parts.append("Income Breakdown Total:\n")
                 row1, row2 = type_df1.iloc[0], type_df2.iloc[0]
@@ -460,456 +679,798 @@ def generate_enhanced_comparison_text_updated(amount_old, amount_new, income_old
     text_parts.extend(["SUMMARY:\n", "=" * 30 + "\n", "• [Add your key insights here]\n", "• [Note any significant patterns]\n", "• [Record actionable findings]"])
     return "".join(text_parts)
 
-def create_dumbbell_chart_updated(df1, df2, variable, date1, date2, group_var, selected_type, var_label):
-    """Create a dumbbell chart showing proportion changes"""
-    if group_var == "none":
-        group_var = "Function"
+def create_dumbbell_chart_updated(agg, variable, date1, date2, group_var, selected_type, var_label):
+    """Create a dumbbell chart showing proportion changes from compute_comparison_agg output grouped by group_var"""
+    if agg is None or group_var not in _VALID_GROUPS:
+        return go.Figure(layout=dict(title=f"{var_label} Proportions - {selected_type}", template="plotly_white", height=350,
+            annotations=[dict(text="Invalid grouping variable", xref="paper", yref="paper", x=0.5, y=0.5,
+                xanchor='center', yanchor='middle', showarrow=False, font=dict(size=14, color="gray"))]))
     
-    if group_var not in ['Division', 'Type', 'Item', 'Function']:
-        fig = go.Figure()
-        fig.add_annotation(text="Invalid grouping variable", xref="paper", yref="paper", x=0.5, y=0.5,
-            xanchor='center', yanchor='middle', showarrow=False, font=dict(size=14, color="gray"))
-        fig.update_layout(title=f"{var_label} Proportions - {selected_type}", template="plotly_white", height=350)
-        return fig
+    # Totals come from the pre-aggregated group sums rather than a second scan
+    vals1, vals2 = agg[(variable, 0)].to_numpy(), agg[(variable, 1)].to_numpy()
+    total1, total2 = vals1.sum(), vals2.sum()
     
-    if not df1.empty:
-        group1_data = df1.groupby(group_var)[variable].sum()
-        total1 = df1[variable].sum()
-        proportions1 = (group1_data / total1 * 100) if total1 > 0 else pd.Series(dtype=float)
-    else:
-        proportions1 = pd.Series(dtype=float)
-        group1_data = pd.Series(dtype=float)
+    if total1 <= 0 and total2 <= 0:
+        return go.Figure(layout=dict(title=f"{var_label} Proportions by {group_var} - {selected_type}", template="plotly_white", height=350,
+            annotations=[dict(text="No data available", xref="paper", yref="paper", x=0.5, y=0.5,
+                xanchor='center', yanchor='middle', showarrow=False, font=dict(size=14, color="gray"))]))
     
-    if not df2.empty:
-        group2_data = df2.groupby(group_var)[variable].sum()
-        total2 = df2[variable].sum()
-        proportions2 = (group2_data / total2 * 100) if total2 > 0 else pd.Series(dtype=float)
-    else:
-        proportions2 = pd.Series(dtype=float)
-        group2_data = pd.Series(dtype=float)
+    # agg.index already holds the sorted groups observed in either month
+    groups = agg.index.tolist()
+    props1 = vals1 / total1 * 100 if total1 > 0 else np.zeros(len(groups))
+    props2 = vals2 / total2 * 100 if total2 > 0 else np.zeros(len(groups))
+    max_vals = np.maximum(vals1, vals2)
+    max_vals = np.where(max_vals > 0, max_vals, 1)
+    sizes1 = np.clip(vals1 / max_vals * 25 + 5, 10, 30)
+    sizes2 = np.clip(vals2 / max_vals * 25 + 5, 10, 30)
+    positions = list(range(len(groups)))
     
-    all_groups = set()
-    if not proportions1.empty: all_groups.update(proportions1.index)
-    if not proportions2.empty: all_groups.update(proportions2.index)
+    # A fixed three traces regardless of the group count: all connectors in one trace (None-separated), one marker trace per month
+    # Segment rows are (month 1, month 2, NaN gap), flattened into one array per axis
+    gaps = np.full(len(groups), np.nan)
+    segment_x = np.column_stack([props1, props2, gaps]).ravel()
+    segment_y = np.column_stack([positions, positions, gaps]).ravel()
+    traces = [dict(type='scatter', x=segment_x, y=segment_y, mode='lines', line=dict(color='gray', width=2),
+        showlegend=False, hoverinfo='skip')]
+    for date, props, vals, sizes, color, outline, legendgroup in [
+            (date1, props1, vals1, sizes1, 'lightgray', 'gray', 'date1'),
+            (date2, props2, vals2, sizes2, 'lightcoral', 'red', 'date2')]:
+        traces.append(dict(type='scatter', x=props, y=positions, mode='markers',
+            marker=dict(size=sizes, color=color, line=dict(width=2, color=outline)),
+            name=f"{date.strftime('%Y-%m')}", legendgroup=legendgroup,
+            customdata=list(zip(groups, format_numbers(vals))),
+            hovertemplate=f"<b>%{{customdata[0]}}</b><br>Month: {date.strftime('%Y-%m')}<br>Proportion: %{{x:.1f}}%<br>Amount: %{{customdata[1]}}<extra></extra>"))
     
-    if not all_groups:
-        fig = go.Figure()
-        fig.add_annotation(text="No data available", xref="paper", yref="paper", x=0.5, y=0.5,
-            xanchor='center', yanchor='middle', showarrow=False, font=dict(size=14, color="gray"))
-        fig.update_layout(title=f"{var_label} Proportions by {group_var} - {selected_type}", template="plotly_white", height=350)
-        return fig
+    layout = dict(_DUMBBELL_LAYOUT_JSON, title=dict(text=f"{var_label} Proportions by {group_var} - {selected_type}"), uirevision=group_var,
+        yaxis=dict(tickmode='array', tickvals=positions, ticktext=groups, title=dict(text=group_var)))
+    # Plain figure dict, like the comparison bars, so the three traces skip plotly's per-property validation
+    fig = {'data': traces, 'layout': layout}
+    return go.Figure(fig) if _VALIDATE_FIGURES else fig
+
+
+def get_comparison_columns(selected_type):
+    """Map a display type (History or Comparison) to its (amount, income) column names"""
+    if selected_type == "Total":
+        return "Amount_total", "Income_total"
+    elif selected_type == "Best":
+        return "Amount_Best", "Income_Best"
+    elif selected_type == "Type1":
+        return "Amount_1", "Income_1"
+    elif selected_type == "Type2":
+        return "Amount_2", "Income_2"
+    return "Amount_3", "Income_3"
+
+
+def get_comparison_slices(selected_type, selected_dates, filter_var, filter_values):
+    """
+    Resolve the two selected months into filtered sample_data slices
+    Returns: tuple of (date1, date2, df_date1, df_date2) or None unless exactly 2 dates are selected
+    """
+    if not selected_dates or len(selected_dates) != 2:
+        return None
+    # The comparison callbacks all fire for the same selection, so share the slices through a cache
+    return _get_comparison_slices_cached(selected_type, tuple(sorted(selected_dates)), filter_var, tuple(filter_values or ()))
+
+
+@functools.lru_cache(maxsize=32)
+def _get_comparison_slices_cached(selected_type, selected_dates, filter_var, filter_values):
+    """Cached body of get_comparison_slices; the returned frames are shared and must not be mutated"""
+    date1, date2 = [pd.to_datetime(date + '-01') for date in selected_dates]
+    df_date1 = _MONTHLY_GROUPS.get(date1.strftime('%Y-%m'), _EMPTY_MONTH)
+    df_date2 = _MONTHLY_GROUPS.get(date2.strftime('%Y-%m'), _EMPTY_MONTH)
     
-    fig = go.Figure()
-    for i, group in enumerate(sorted(all_groups)):
-        prop1, prop2 = proportions1.get(group, 0), proportions2.get(group, 0)
-        val1, val2 = group1_data.get(group, 0), group2_data.get(group, 0)
-        max_val = max(val1, val2) if max(val1, val2) > 0 else 1
-        size1 = max(10, min(30, (val1 / max_val) * 25 + 5))
-        size2 = max(10, min(30, (val2 / max_val) * 25 + 5))
-        
-        fig.add_trace(go.Scatter(x=[prop1, prop2], y=[i, i], mode='lines', line=dict(color='gray', width=2),
-            showlegend=False, hoverinfo='skip'))
-        fig.add_trace(go.Scatter(x=[prop1], y=[i], mode='markers',
-            marker=dict(size=size1, color='lightgray', line=dict(width=2, color='gray')),
-            name=f"{date1.strftime('%Y-%m')}", legendgroup="date1", showlegend=(i == 0),
-            hovertemplate=f"<b>{group}</b><br>Month: {date1.strftime('%Y-%m')}<br>Proportion: {prop1:.1f}%<br>Amount: {format_number(val1)}<extra></extra>"))
-        fig.add_trace(go.Scatter(x=[prop2], y=[i], mode='markers',
-            marker=dict(size=size2, color='lightcoral', line=dict(width=2, color='red')),
-            name=f"{date2.strftime('%Y-%m')}", legendgroup="date2", showlegend=(i == 0),
-            hovertemplate=f"<b>{group}</b><br>Month: {date2.strftime('%Y-%m')}<br>Proportion: {prop2:.1f}%<br>Amount: {format_number(val2)}<extra></extra>"))
+    if filter_var != "none" and filter_var in sample_data.columns and filter_values:
+        df_date1 = df_date1[df_date1[filter_var].isin(filter_values)]
+        df_date2 = df_date2[df_date2[filter_var].isin(filter_values)]
+    
+    # Create Best columns if needed (only on the two monthly slices)
+    if selected_type == "Best":
+        df_date1 = df_date1.assign(Amount_Best=df_date1['Amount_1'] + df_date1['Amount_2'], Income_Best=df_date1['Income_1'] + df_date1['Income_2'])
+        df_date2 = df_date2.assign(Amount_Best=df_date2['Amount_1'] + df_date2['Amount_2'], Income_Best=df_date2['Income_1'] + df_date2['Income_2'])
     
-    fig.update_layout(title=f"{var_label} Proportions by {group_var} - {selected_type}", xaxis_title="Proportion (%)",
-        yaxis=dict(tickmode='array', tickvals=list(range(len(all_groups))), ticktext=list(sorted(all_groups)), title=group_var),
-        template="plotly_white", height=350, showlegend=True, margin=dict(l=100, r=50, t=80, b=50))
-    return fig
+    return date1, date2, df_date1, df_date2
+
+
+def get_comparison_totals(date1, date2, amount_col, income_col, filter_var, filter_values):
+    """Return (amount_old, amount_new, income_old, income_new) for the two comparison months"""
+    month1, month2 = date1.strftime('%Y-%m'), date2.strftime('%Y-%m')
+    return (monthly_total(month1, amount_col, filter_var, filter_values), monthly_total(month2, amount_col, filter_var, filter_values),
+        monthly_total(month1, income_col, filter_var, filter_values), monthly_total(month2, income_col, filter_var, filter_values))
+
+
+@functools.cache
+def create_empty_comparison_figure():
+    """Placeholder figure dict shown until exactly 2 dates are selected (built once, shared read-only)"""
+    empty_fig = go.Figure()
+    empty_fig.update_layout(title="Select 2 dates to compare", template="plotly_white", height=300, showlegend=False)
+    empty_fig.add_annotation(text="Please select exactly 2 dates for comparison", xref="paper", yref="paper",
+        x=0.5, y=0.5, xanchor='center', yanchor='middle', showarrow=False, font=dict(size=14, color="gray"))
+    return plain_figure(empty_fig)
+
+
+def get_comparison_category(group_var, stack_var):
+    """Return (category_col, barmode) for the comparison bar charts; grouping takes precedence over stacking"""
+    if group_var in _VALID_GROUPS:
+        return group_var, 'group'
+    if stack_var in _VALID_GROUPS:
+        return stack_var, 'stack'
+    return None, None
+
+
+def compute_comparison_agg(df1, df2, category_col, value_cols):
+    """
+    Sum value_cols per category for both comparison months in a single pass
+    Returns: DataFrame indexed by sorted category (a single 'Total' row when category_col is None) with (value_col, 0|1) columns
+    """
+    n1 = len(df1)
+    if category_col is None:
+        codes, uniques = np.zeros(n1 + len(df2), dtype=np.intp), pd.Index(['Total'])
+        observed = slice(None)
+    else:
+        # The sorted categorical's codes index its categories directly: no hashing, no sorting, no set unions
+        uniques = df1[category_col].cat.categories.rename(category_col)
+        codes = np.concatenate([df1[category_col].cat.codes.to_numpy(), df2[category_col].cat.codes.to_numpy()]).astype(np.intp)
+        observed = np.bincount(codes, minlength=len(uniques)) > 0
+    # Interleave the month into the bin index so one np.bincount covers both dates and all categories
+    bins = codes * 2
+    bins[n1:] += 1
+    sums = {}
+    for col in value_cols:
+        weights = np.concatenate([df1[col].to_numpy(), df2[col].to_numpy()])
+        # Keep bincount's float64 sums: cast back to float32 they lose the first decimal near the monthly totals
+        binned = np.bincount(bins, weights=weights, minlength=2 * len(uniques)).reshape(-1, 2)[observed]
+        sums[(col, 0)], sums[(col, 1)] = binned[:, 0], binned[:, 1]
+    return pd.DataFrame(sums, index=uniques[observed])
+
+
+@functools.lru_cache(maxsize=64)
+def _get_comparison_aggregate_cached(selected_type, selected_dates, filter_var, filter_values, category_col):
+    """Per-category amount/income sums for the normalised selection, shared by the comparison charts and text; must not be mutated"""
+    _, _, df_date1, df_date2 = _get_comparison_slices_cached(selected_type, selected_dates, filter_var, filter_values)
+    return compute_comparison_agg(df_date1, df_date2, category_col, list(get_comparison_columns(selected_type)))
+
+
+@functools.lru_cache(maxsize=64)
+def _comparison_chart_cached(selected_type, selected_dates, filter_var, filter_values, category_col, barmode, variable, var_label):
+    """create_comparison_chart memoised on the normalised selection, stored as a plain figure dict"""
+    date1, date2 = [pd.to_datetime(date + '-01') for date in selected_dates]
+    agg = _get_comparison_aggregate_cached(selected_type, selected_dates, filter_var, filter_values, category_col)
+    return plain_figure(create_comparison_chart(agg, variable, var_label, date1, date2, category_col, barmode, selected_type))
+
+
+@functools.lru_cache(maxsize=64)
+def _dumbbell_chart_cached(selected_type, selected_dates, filter_var, filter_values, group_var, variable, var_label):
+    """create_dumbbell_chart_updated memoised on the normalised selection, stored as a plain figure dict"""
+    date1, date2 = [pd.to_datetime(date + '-01') for date in selected_dates]
+    agg = _get_comparison_aggregate_cached(selected_type, selected_dates, filter_var, filter_values, group_var) if group_var in _VALID_GROUPS else None
+    return plain_figure(create_dumbbell_chart_updated(agg, variable, date1, date2, group_var, selected_type, var_label))
+
+
+@functools.lru_cache(maxsize=64)
+def _division_chart_cached(selected_type, selected_dates, filter_var, filter_values, variable, var_label):
+    """create_division_stacked_chart memoised on the normalised selection, stored as a plain figure dict"""
+    date1, date2 = [pd.to_datetime(date + '-01') for date in selected_dates]
+    agg = _get_comparison_aggregate_cached(selected_type, selected_dates, filter_var, filter_values, 'Division')
+    return plain_figure(create_division_stacked_chart(agg, variable, var_label, date1, date2, selected_type))
+
+
+@functools.lru_cache(maxsize=32)
+def _type2_breakdown_charts_cached(selected_type, selected_dates, filter_var, filter_values, group_var):
+    """create_type2_breakdown_charts memoised on the normalised selection, stored as plain figure dicts"""
+    date1, date2 = [pd.to_datetime(date + '-01') for date in selected_dates]
+    amount_fig, income_fig = create_type2_breakdown_charts(date1, date2, filter_var, list(filter_values), group_var, selected_type)
+    return plain_figure(amount_fig), plain_figure(income_fig)
+
+
+def create_comparison_chart(agg, variable, var_label, date1, date2, category_col, barmode, selected_type):
+    """Create the two-date bar chart figure dict from compute_comparison_agg output, grouped or stacked by category when selected"""
+    date_labels = [date1.strftime('%b-%Y'), date2.strftime('%b-%Y')]
+    x_title = "Month"
+    s1, s2 = agg[(variable, 0)], agg[(variable, 1)]
+    sorted_categories = agg.index
+    # Bar labels for every category in one vectorized pass per date instead of a Python format call per value
+    text1, text2 = format_numbers(s1.values), format_numbers(s2.values)
+    hover1, hover2 = format_numbers(s1.values, 3), format_numbers(s2.values, 3)
+    traces = []
+    if barmode == 'group':
+        # One trace per date with the categories along x, so the trace count no longer grows with the group cardinality
+        comparison_colors = get_color_sequence('grouped', 2, is_comparison=True)
+        x_categories = [f"{category}" for category in sorted_categories]
+        for date_label, values, text, hover_text, color in zip(date_labels, (s1.values, s2.values), (text1, text2), (hover1, hover2), comparison_colors):
+            traces.append(dict(type='bar', x=x_categories, y=values, name=date_label,
+                marker=dict(color=color),
+                text=text, textposition='auto',
+                customdata=hover_text,
+                hovertemplate='<b>%{x}</b><br>' + f'{date_label}<br>' + 'Value: %{customdata}<extra></extra>'))
+        x_title = category_col
+    elif barmode == 'stack':
+        colors = get_color_sequence('stacked', len(sorted_categories))
+        for i, (category, val1, val2) in enumerate(zip(sorted_categories, s1.values, s2.values)):
+            traces.append(dict(type='bar', x=date_labels, y=[val1, val2], name=f"{category}",
+                marker=dict(color=colors[i]),
+                text=[text1[i], text2[i]], textposition='auto',
+                customdata=[hover1[i], hover2[i]],
+                hovertemplate='<b>%{x}</b><br>' + f'{category}<br>' + 'Value: %{customdata}<extra></extra>'))
+    else:
+        val1, val2 = s1.iloc[0], s2.iloc[0]
+        comparison_colors = get_color_sequence('bar', 2, is_comparison=True)
+        traces.append(dict(type='bar', x=date_labels, y=[val1, val2], name=var_label,
+            marker=dict(color=comparison_colors), text=[text1[0], text2[0]], textposition='auto',
+            customdata=[hover1[0], hover2[0]],
+            hovertemplate='<b>%{x}</b><br>Value: %{customdata}<extra></extra>'))
+
+    max_val = max(s1.max(), s2.max()) if len(sorted_categories) else 0
+    if max_val >= 1e9:
+        yaxis = dict(tickformat=".2s", title=dict(text="Value (Billions)"))
+    elif max_val >= 1e6:
+        yaxis = dict(tickformat=".2s", title=dict(text="Value (Millions)"))
+    elif max_val >= 1e3:
+        yaxis = dict(tickformat=".2s", title=dict(text="Value (Thousands)"))
+    else:
+        yaxis = dict(title=dict(text="Value"))
+
+    layout = dict(_COMPARISON_BAR_LAYOUT_JSON, title=dict(text=f"{var_label} Comparison - {selected_type}"),
+        xaxis=dict(_COMPARISON_BAR_LAYOUT_JSON['xaxis'], title=dict(text=x_title)), yaxis=yaxis)
+    if barmode:
+        layout['barmode'] = barmode
+    fig = {'data': traces, 'layout': layout}
+    return go.Figure(fig) if _VALIDATE_FIGURES else fig
+
+
+def create_division_stacked_chart(agg, variable, var_label, date1, date2, selected_type):
+    """Create a 100% stacked bar of each Division's share for the two dates from compute_comparison_agg output"""
+    date_labels = [date1.strftime('%Y-%m'), date2.strftime('%Y-%m')]
+
+    div1, div2 = agg[(variable, 0)].to_numpy(), agg[(variable, 1)].to_numpy()
+    total1, total2 = div1.sum(), div2.sum()
+
+    # agg.index already holds the sorted divisions observed in either month
+    sorted_divisions = agg.index.tolist() if total1 > 0 or total2 > 0 else []
+    colors = get_color_sequence('stacked', len(sorted_divisions))
+    pcts1 = div1 / total1 * 100 if total1 > 0 else np.zeros(len(div1))
+    pcts2 = div2 / total2 * 100 if total2 > 0 else np.zeros(len(div2))
+    labels1, labels2 = np.char.mod('%.1f%%', pcts1).tolist(), np.char.mod('%.1f%%', pcts2).tolist()
+    traces = []
+    for i, division in enumerate(sorted_divisions):
+        p1, p2 = pcts1[i], pcts2[i]
+        traces.append(go.Bar(x=date_labels, y=[p1, p2], name=division,
+            marker_color=colors[i],
+            text=[labels1[i], labels2[i]], textposition='inside',
+            hovertemplate='<b>%{x}</b><br>' + f'{division}<br>' + 'Percentage: %{y:.1f}%<extra></extra>'))
+
+    return go.Figure(data=traces, layout=go.Layout(_DIVISION_LAYOUT,
+        title=f"{var_label} Percentage Contribution by Division - {selected_type}"))
+
+
+def create_type2_breakdown_charts(date1, date2, filter_var, filter_values, group_var, selected_type):
+    """Create Type2 breakdown charts showing WW, DP, PP proportions"""
+    type_df1, type_df2, type_group_cols = prepare_type_breakdown_data(date1, date2, filter_var, filter_values, group_var)
+
+    date_labels = [date1.strftime('%Y-%m'), date2.strftime('%Y-%m')]
+
+    if type_df1 is None or type_df2 is None:
+        # Return empty figures if data not available
+        empty_fig = go.Figure(layout=dict(template="plotly_white", height=350,
+            annotations=[dict(text="Type breakdown data not available", xref="paper", yref="paper",
+                x=0.5, y=0.5, xanchor='center', yanchor='middle', showarrow=False)]))
+        return empty_fig, empty_fig
+
+    def component_shares(type_df, categories, components):
+        # One indexed reindex per frame instead of a boolean mask per category; missing categories read as 0%
+        rows = type_df.set_index(group_var).reindex(categories)[components]
+        present = rows[components[0]].notna().to_numpy()
+        shares = rows.div(rows.sum(axis=1).where(present, 1), axis=0) * 100
+        shares[~present] = 0
+        return shares
+
+    # Sorted union of both months' categories, computed once for both charts
+    categories = np.union1d(type_df1[group_var].to_numpy(), type_df2[group_var].to_numpy()).tolist() if type_group_cols else []
+
+    # Amount breakdown chart
+    traces = []
+
+    if type_group_cols:
+        # Grouped by category - show side-by-side grouped bars
+        components = ['WW_Amount', 'DP_Amount', 'PP_Amount']
+        colors_comp = ['#718096', '#E53E3E', '#48BB78']  # Gray, Red, Green
+
+        shares1, shares2 = component_shares(type_df1, categories, components), component_shares(type_df2, categories, components)
+        for comp_idx, component in enumerate(components):
+            vals_date1 = shares1[component].tolist()
+            vals_date2 = shares2[component].tolist()
+
+            # Add traces for each date
+            traces.append(go.Bar(
+                x=[f"{cat} - {date_labels[0]}" for cat in categories],
+                y=vals_date1,
+                name=component.replace('_Amount', ''),
+                marker_color=colors_comp[comp_idx],
+                text=[f"{v:.1f}%" for v in vals_date1],
+                textposition='inside',
+                legendgroup=component,
+                showlegend=True
+            ))
+            traces.append(go.Bar(
+                x=[f"{cat} - {date_labels[1]}" for cat in categories],
+                y=vals_date2,
+                name=component.replace('_Amount', ''),
+                marker_color=colors_comp[comp_idx],
+                text=[f"{v:.1f}%" for v in vals_date2],
+                textposition='inside',
+                legendgroup=component,
+                showlegend=False
+            ))
+
+    else:
+        # Total view - simple stacked bars
+        row1, row2 = type_df1.iloc[0], type_df2.iloc[0]
+        components = ['WW_Amount', 'DP_Amount', 'PP_Amount']
+        colors_comp = ['#718096', '#E53E3E', '#48BB78']
+
+        for comp_idx, component in enumerate(components):
+            total1 = row1['WW_Amount'] + row1['DP_Amount'] + row1['PP_Amount']
+            total2 = row2['WW_Amount'] + row2['DP_Amount'] + row2['PP_Amount']
+
+            pct1 = (row1[component] / total1 * 100) if total1 > 0 else 0
+            pct2 = (row2[component] / total2 * 100) if total2 > 0 else 0
+
+            traces.append(go.Bar(
+                x=date_labels,
+                y=[pct1, pct2],
+                name=component.replace('_Amount', ''),
+                marker_color=colors_comp[comp_idx],
+                text=[f"{pct1:.1f}%", f"{pct2:.1f}%"],
+                textposition='inside',
+                hovertemplate='<b>%{x}</b><br>' + component.replace('_Amount', '') + '<br>Percentage: %{y:.1f}%<extra></extra>'
+            ))
+
+    fig_amount = go.Figure(data=traces, layout=dict(
+        title=f"Amount Breakdown (WW / DP / PP) - {selected_type}",
+        barmode='stack',
+        xaxis_title="Period" if not type_group_cols else group_var,
+        yaxis_title="Percentage (%)",
+        template="plotly_white",
+        height=350,
+        showlegend=True,
+        yaxis=dict(range=[0, 100], ticksuffix="%")
+    ))
+
+    # Income breakdown chart (same logic as amount)
+    traces = []
+
+    if type_group_cols:
+        components = ['WW_Income', 'DP_Income', 'PP_Income']
+        colors_comp = ['#718096', '#E53E3E', '#48BB78']
+
+        shares1, shares2 = component_shares(type_df1, categories, components), component_shares(type_df2, categories, components)
+        for comp_idx, component in enumerate(components):
+            vals_date1 = shares1[component].tolist()
+            vals_date2 = shares2[component].tolist()
+
+            traces.append(go.Bar(
+                x=[f"{cat} - {date_labels[0]}" for cat in categories],
+                y=vals_date1,
+                name=component.replace('_Income', ''),
+                marker_color=colors_comp[comp_idx],
+                text=[f"{v:.1f}%" for v in vals_date1],
+                textposition='inside',
+                legendgroup=component,
+                showlegend=True
+            ))
+            traces.append(go.Bar(
+                x=[f"{cat} - {date_labels[1]}" for cat in categories],
+                y=vals_date2,
+                name=component.replace('_Income', ''),
+                marker_color=colors_comp[comp_idx],
+                text=[f"{v:.1f}%" for v in vals_date2],
+                textposition='inside',
+                legendgroup=component,
+                showlegend=False
+            ))
+
+    else:
+        row1, row2 = type_df1.iloc[0], type_df2.iloc[0]
+        components = ['WW_Income', 'DP_Income', 'PP_Income']
+        colors_comp = ['#718096', '#E53E3E', '#48BB78']
+
+        for comp_idx, component in enumerate(components):
+            total1 = row1['WW_Income'] + row1['DP_Income'] + row1['PP_Income']
+            total2 = row2['WW_Income'] + row2['DP_Income'] + row2['PP_Income']
+
+            pct1 = (row1[component] / total1 * 100) if total1 > 0 else 0
+            pct2 = (row2[component] / total2 * 100) if total2 > 0 else 0
+
+            traces.append(go.Bar(
+                x=date_labels,
+                y=[pct1, pct2],
+                name=component.replace('_Income', ''),
+                marker_color=colors_comp[comp_idx],
+                text=[f"{pct1:.1f}%", f"{pct2:.1f}%"],
+                textposition='inside',
+                hovertemplate='<b>%{x}</b><br>' + component.replace('_Income', '') + '<br>Percentage: %{y:.1f}%<extra></extra>'
+            ))
+
+    fig_income = go.Figure(data=traces, layout=dict(
+        title=f"Income Breakdown (WW / DP / PP) - {selected_type}",
+        barmode='stack',
+        xaxis_title="Period" if not type_group_cols else group_var,
+        yaxis_title="Percentage (%)",
+        template="plotly_white",
+        height=350,
+        showlegend=True,
+        yaxis=dict(range=[0, 100], ticksuffix="%")
+    ))
+
+    return fig_amount, fig_income
 
 # ============================================================================
 # APP LAYOUT
 # ============================================================================
-app.layout = dmc.MantineProvider(
-    theme={"colorScheme": "light", "primaryColor": "gray"},
-    children=[dmc.AppShell(
-        id="app-shell", header={"height": 60}, navbar={"width": 250, "breakpoint": "sm"}, padding="md",
-        children=[
-            dmc.AppShellHeader(px="md", children=[
-                dmc.Group(justify="space-between", h="100%", children=[
-                    dmc.Title("Dashboard", order=3, c="blue"),
-                    dmc.Text(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", size="sm", c="dimmed"),
-                ])
-            ]),
-            dmc.AppShellNavbar(p="md", children=[
-                dmc.Title("Navigation", order=4, mb="md"),
-                dmc.NavLink(label="Today", id="nav-today", leftSection=DashIconify(icon="material-symbols:today", width=20), active=True),
-                dmc.NavLink(label="Scenario", id="nav-scenario", leftSection=DashIconify(icon="material-symbols:analytics", width=20)),
-            ]),
-            dmc.AppShellMain(id="main-content", children=[
-                html.Div(id="today-content", style={"display": "block"}, children=[
-                    dmc.Tabs(value="history", id="main-tabs", children=[
-                        dmc.TabsList([
-                            dmc.TabsTab("History", value="history"),
-                            dmc.TabsTab("Comparison", value="comparison"),
-                            dmc.TabsTab("Tool", value="tool"),
-                        ]),
-                        dmc.TabsPanel(value="history", children=[
-                            dmc.Stack([
-                                dmc.Card([
-                                    dmc.CardSection([
-                                        dmc.Title("Chart Controls", order=4, mb="md"),
-                                        dmc.Stack([
-                                            dmc.Text("Display Variable:", size="sm", fw=500, mb=5),
-                                            dmc.SegmentedControl(id="variable-selector", value="Total", orientation="horizontal",
-                                                fullWidth=True, color="blue", size="sm",
-                                                data=[{"value": "Total", "label": "Total"}, {"value": "Best", "label": "Best"},
-                                                    {"value": "Type1", "label": "Type 1"}, {"value": "Type2", "label": "Type 2"}, 
-                                                    {"value": "Type3", "label": "Type 3"}]),
-                                        ], gap="xs", mb="md"),
-                                        dmc.Stack([
-                                            dmc.Text("Year Range:", size="sm", fw=500, mb=5),
-                                            dmc.RangeSlider(
-                                                id="year-range-slider",
-                                                min=min_year,
-                                                max=max_year,
-                                                step=1,
-                                                value=[min_year, max_year],
-                                                marks=[{"value": year, "label": str(year)} for year in range(min_year, max_year + 1)],
-                                                mb="md",
-                                                minRange=1,
-                                                size="md",
-                                                style={"width": "100%"}
-                                            )
-                                        ], gap="xs", mb="lg"),
-                                        dmc.Grid([
-                                            dmc.GridCol(span=4, children=[dmc.Text("Filter by:", size="sm", fw=500, mb=5),
-                                                dmc.Select(id="filter-selector", placeholder="Select filter", value="none", size="sm",
-                                                    data=[{"value": "none", "label": "No Filter"}, {"value": "Division", "label": "Division"},
-                                                        {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
-                                            dmc.GridCol(span=4, children=[dmc.Text("Stack by:", size="sm", fw=500, mb=5),
-                                                dmc.Select(id="stack-selector", placeholder="Select stack variable", value="none", size="sm",
-                                                    data=[{"value": "none", "label": "No Stack"}, {"value": "Division", "label": "Division"},
-                                                        {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
-                                            dmc.GridCol(span=4, children=[dmc.Text("Group by:", size="sm", fw=500, mb=5),
-                                                dmc.Select(id="group-selector", placeholder="Select group variable", value="none", size="sm",
-                                                    data=[{"value": "none", "label": "No Grouping"}, {"value": "Division", "label": "Division"},
-                                                        {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
-                                        ], gutter="md", mb="lg"),
-                                        html.Div([dmc.Text("Filter values:", size="sm", fw=500, mb=5),
-                                            dmc.MultiSelect(id="filter-values-selector", placeholder="Select values", data=[], value=[], size="sm", disabled=True)],
-                                            style={"width": "100%"}),
-                                    ], withBorder=True, inheritPadding=True, py="md"),
-                                ], withBorder=True, shadow="sm", radius="md", mb="md"),
-                                
-                                dmc.Card([
-                                    dmc.CardSection([
-                                        dmc.Title("Events Summary", order=4, mb="md"),
-                                        dmc.Stack([
-                                            dmc.Text("Select dates:", size="sm", fw=500, mb=5),                                            
-                                            dmc.MultiSelect(id="events-date-selector", placeholder="Select maximum 3 dates", data=[], value=[],
-                                                maxValues=3, size="sm", searchable=True, clearable=True, leftSection=DashIconify(icon="material-symbols:calendar-month", width=20),
-                                                styles={"dropdown": {"maxHeight": "200px", "overflowY": "auto"}, "input": {"minWidth": "300px"}}),
-                                            dmc.Textarea(
-                                                id="events-textbox",
-                                                placeholder="Enter events and notes for selected dates...",
-                                                autosize=True,
-                                                minRows=4,
-                                                maxRows=8,
-                                                value="Events Summary:\n• Select dates above to track important events\n• Document key milestones and observations\n• Add context for significant changes"
-                                            )
-                                        ], gap="xs")
-                                    ], withBorder=True, inheritPadding=True, py="xs"),
-                                    dmc.CardSection([dmc.Button("Generate Summary", id="generate-summary-btn", variant="filled", size="sm", fullWidth=True)],
-                                        inheritPadding=True, pt="xs")
-                                ], withBorder=True, shadow="sm", radius="md", mb="md"),
-                                
-                                dmc.Card([
-                                    dmc.CardSection([dmc.Title("Summary Metrics", order=6, mb="sm"), html.Div(id="history-summary-boxes")],
-                                        inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([dmc.Title("Amount Analysis", order=6, mb="sm"), dcc.Graph(id="amount-barchart", style={"height": "350px"})],
-                                        inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([dmc.Title("Income Analysis", order=6, mb="sm"), dcc.Graph(id="income-barchart", style={"height": "350px"})],
-                                        inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([dmc.Title("Return Ratio (Income/Amount)", order=6, mb="sm"), dcc.Graph(id="ratio-chart", style={"height": "250px"})],
-                                        inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([
-                                        dmc.Group([
-                                            dmc.Button("Export History Data - Excel", id="history-export-btn", variant="filled", size="sm",
-                                                leftSection=DashIconify(icon="vscode-icons:file-type-excel", width=20)),
-                                            dmc.Button("Export Charts as PNG", id="history-png-btn", variant="filled", size="sm", 
-                                                leftSection=DashIconify(icon="mdi:image", width=20)),
-                                        ]),
-                                        dcc.Download(id="download-history-data"),
-                                        dcc.Download(id="download-history-png"),
-                                    ], inheritPadding=True, pt="xs"),
-                                ], withBorder=True, shadow="sm", radius="md")
-                            ], gap="md")
-                        ]),
-                        dmc.TabsPanel(value="comparison", children=[
-                            dmc.Stack([
-                                dmc.Card([
-                                    dmc.CardSection([
-                                        dmc.Title("Comparison Controls", order=4, mb="md"),
-                                        dmc.Group([dmc.Stack([dmc.Text("Display Type:", size="sm", fw=500, mb=5),
-                                            dmc.SegmentedControl(id="comparison-type-selector", value="Total", orientation="horizontal", fullWidth=False, color="blue", size="sm",
-                                                data=[{"value": "Total", "label": "Total"}, {"value": "Best", "label": "Best"},
-                                                    {"value": "Type1", "label": "Type 1"}, {"value": "Type2", "label": "Type 2"}, {"value": "Type3", "label": "Type 3"}])],
-                                            gap="xs", style={"flex": 1})], justify="flex-start", align="flex-start", mb="lg"),
-                                        dmc.Group([dmc.Stack([dmc.Text("Select Dates for Comparison:", size="sm", fw=500, mb=5),
-                                            dmc.MultiSelect(id="comparison-date-selector", placeholder="Select exactly 2 dates to compare", data=[], value=[],
-                                                maxValues=2, size="sm", searchable=True, clearable=True, leftSection=DashIconify(icon="material-symbols:calendar-month", width=20),
-                                                styles={"dropdown": {"maxHeight": "200px", "overflowY": "auto"}, "input": {"minWidth": "300px"}})],
-                                            gap="xs", style={"flex": 1})], justify="flex-start", align="flex-start", mb="lg"),
-                                        dmc.Grid([
-                                            dmc.GridCol(span=4, children=[dmc.Text("Filter by:", size="sm", fw=500, mb=5),
-                                                dmc.Select(id="comparison-filter-selector", placeholder="Select filter", value="none", size="sm",
-                                                    data=[{"value": "none", "label": "No Filter"}, {"value": "Division", "label": "Division"},
-                                                        {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
-                                            dmc.GridCol(span=4, children=[dmc.Text("Stack by:", size="sm", fw=500, mb=5),
-                                                dmc.Select(id="comparison-stack-selector", placeholder="Select stack variable", value="none", size="sm",
-                                                    data=[{"value": "none", "label": "No Stack"}, {"value": "Division", "label": "Division"},
-                                                        {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
-                                            dmc.GridCol(span=4, children=[dmc.Text("Group by:", size="sm", fw=500, mb=5),
-                                                dmc.Select(id="comparison-group-selector", placeholder="Select group variable", value="none", size="sm",
-                                                    data=[{"value": "none", "label": "No Grouping"}, {"value": "Division", "label": "Division"},
-                                                        {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
-                                        ], gutter="md", mb="lg"),
-                                        html.Div([dmc.Text("Filter values:", size="sm", fw=500, mb=5),
-                                            dmc.MultiSelect(id="comparison-filter-values-selector", placeholder="Select values", data=[], value=[], size="sm", disabled=True)],
-                                            style={"width": "100%"}),
-                                    ], withBorder=True, inheritPadding=True, py="md"),
-                                ], withBorder=True, shadow="sm", radius="md", mb="md"),
-                                dmc.Card([
-                                    dmc.CardSection([dmc.Title("Comparison Notes", order=4, mb="md"),
-                                        dmc.Textarea(id="comparison-textbox", placeholder="Enter your comparison analysis notes here...", autosize=True, minRows=8, maxRows=15,
-                                            value="Comparison Analysis:\n\n• Select exactly 2 dates to compare data\n• Use filters and grouping to focus analysis\n• Monitor value changes and ratios\n• Identify significant trends between periods")],
-                                        withBorder=True, inheritPadding=True, py="xs"),
-                                    dmc.CardSection([dmc.Button("Save Comparison", id="save-comparison-btn", variant="filled", size="sm", fullWidth=True)],
-                                        inheritPadding=True, pt="xs")
-                                ], withBorder=True, shadow="sm", radius="md", mb="md"),
-                                dmc.Card([
-                                    dmc.CardSection([dmc.Title("Comparison Metrics", order=6, mb="sm"), html.Div(id="comparison-value-boxes")],
-                                        inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([dmc.Grid([
-                                        dmc.GridCol([dmc.Title("Amount Total Comparison", order=6, mb="sm"), dcc.Graph(id="comparison-var1-chart", style={"height": "300px"})], span=6),
-                                        dmc.GridCol([dmc.Title("Income Total Comparison", order=6, mb="sm"), dcc.Graph(id="comparison-var2-chart", style={"height": "300px"})], span=6),
-                                    ], gutter="md")], inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([dmc.Title("Proportion Changes Analysis", order=6, mb="sm"),
-                                        dmc.Grid([
-                                            dmc.GridCol([dmc.Title("Amount Total Proportion Changes", order=6, mb="sm"), dcc.Graph(id="var1-dumbbell-chart", style={"height": "350px"})], span=6),
-                                            dmc.GridCol([dmc.Title("Income Total Proportion Changes", order=6, mb="sm"), dcc.Graph(id="var2-dumbbell-chart", style={"height": "350px"})], span=6),
-                                        ], gutter="md")], inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([dmc.Title("Division Percentage Contribution", order=6, mb="sm"),
-                                        dmc.Grid([
-                                            dmc.GridCol([dmc.Title("Amount by Division", order=6, mb="sm"), dcc.Graph(id="amount-division-chart", style={"height": "350px"})], span=6),
-                                            dmc.GridCol([dmc.Title("Income by Division", order=6, mb="sm"), dcc.Graph(id="income-division-chart", style={"height": "350px"})], span=6),
-                                        ], gutter="md")], inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([dmc.Title("Type 2 Breakdown (WW / DP / PP)", order=6, mb="sm"),
-                                        dmc.Grid([
-                                            dmc.GridCol([dmc.Title("Amount Breakdown", order=6, mb="sm"), dcc.Graph(id="type2-amount-chart", style={"height": "350px"})], span=6),
-                                            dmc.GridCol([dmc.Title("Income Breakdown", order=6, mb="sm"), dcc.Graph(id="type2-income-chart", style={"height": "350px"})], span=6),
+def serve_layout():
+    """Build the page layout per load, so the header timestamp reflects when the page was served"""
+    initial = _initial_outputs()
+    return dmc.MantineProvider(
+        theme={"colorScheme": "light", "primaryColor": "gray"},
+        children=[dmc.AppShell(
+            id="app-shell", header={"height": 60}, navbar={"width": 250, "breakpoint": "sm"}, padding="md",
+            children=[
+                dmc.AppShellHeader(px="md", children=[
+                    dmc.Group(justify="space-between", h="100%", children=[
+                        dmc.Title("Dashboard", order=3, c="blue"),
+                        dmc.Text(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", size="sm", c="dimmed"),
+                    ])
+                ]),
+                dmc.AppShellNavbar(p="md", children=[
+                    dmc.Title("Navigation", order=4, mb="md"),
+                    dmc.NavLink(label="Today", id="nav-today", leftSection=DashIconify(icon="material-symbols:today", width=20), active=True),
+                    dmc.NavLink(label="Scenario", id="nav-scenario", leftSection=DashIconify(icon="material-symbols:analytics", width=20)),
+                ]),
+                dmc.AppShellMain(id="main-content", children=[
+                    html.Div(id="today-content", style={"display": "block"}, children=[
+                        # Only the active panel is mounted, so the Comparison and Tool charts are not rendered until opened
+                        dmc.Tabs(value="history", id="main-tabs", keepMounted=False, children=[
+                            dmc.TabsList([
+                                dmc.TabsTab("History", value="history"),
+                                dmc.TabsTab("Comparison", value="comparison"),
+                                dmc.TabsTab("Tool", value="tool"),
+                            ]),
+                            dmc.TabsPanel(value="history", children=[
+                                dmc.Stack([
+                                    dmc.Card([
+                                        dmc.CardSection([
+                                            dmc.Title("Chart Controls", order=4, mb="md"),
+                                            dmc.Stack([
+                                                dmc.Text("Display Variable:", size="sm", fw=500, mb=5),
+                                                dmc.SegmentedControl(id="variable-selector", value="Total", orientation="horizontal",
+                                                    fullWidth=True, color="blue", size="sm",
+                                                    data=[{"value": "Total", "label": "Total"}, {"value": "Best", "label": "Best"},
+                                                        {"value": "Type1", "label": "Type 1"}, {"value": "Type2", "label": "Type 2"}, 
+                                                        {"value": "Type3", "label": "Type 3"}]),
+                                            ], gap="xs", mb="md"),
+                                            dmc.Stack([
+                                                dmc.Text("Year Range:", size="sm", fw=500, mb=5),
+                                                dmc.RangeSlider(
+                                                    id="year-range-slider",
+                                                    # Publish the value once per drag (on release), not on every step
+                                                    updatemode="mouseup",
+                                                    min=min_year,
+                                                    max=max_year,
+                                                    step=1,
+                                                    value=[min_year, max_year],
+                                                    marks=[{"value": year, "label": str(year)} for year in range(min_year, max_year + 1)],
+                                                    mb="md",
+                                                    minRange=1,
+                                                    size="md",
+                                                    style={"width": "100%"}
+                                                )
+                                            ], gap="xs", mb="lg"),
+                                            dmc.Grid([
+                                                dmc.GridCol(span=4, children=[dmc.Text("Filter by:", size="sm", fw=500, mb=5),
+                                                    dmc.Select(id="filter-selector", placeholder="Select filter", value="none", size="sm",
+                                                        data=[{"value": "none", "label": "No Filter"}, {"value": "Division", "label": "Division"},
+                                                            {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
+                                                dmc.GridCol(span=4, children=[dmc.Text("Stack by:", size="sm", fw=500, mb=5),
+                                                    dmc.Select(id="stack-selector", placeholder="Select stack variable", value="none", size="sm",
+                                                        data=[{"value": "none", "label": "No Stack"}, {"value": "Division", "label": "Division"},
+                                                            {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
+                                                dmc.GridCol(span=4, children=[dmc.Text("Group by:", size="sm", fw=500, mb=5),
+                                                    dmc.Select(id="group-selector", placeholder="Select group variable", value="none", size="sm",
+                                                        data=[{"value": "none", "label": "No Grouping"}, {"value": "Division", "label": "Division"},
+                                                            {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
+                                            ], gutter="md", mb="lg"),
+                                            html.Div([dmc.Text("Filter values:", size="sm", fw=500, mb=5),
+                                                dmc.MultiSelect(id="filter-values-selector", placeholder="Select values", data=[], value=[], size="sm", disabled=True)],
+                                                style={"width": "100%"}),
+                                        ], withBorder=True, inheritPadding=True, py="md"),
+                                    ], withBorder=True, shadow="sm", radius="md", mb="md"),
+                                    
+                                    dmc.Card([
+                                        dmc.CardSection([
+                                            dmc.Title("Events Summary", order=4, mb="md"),
+                                            dmc.Stack([
+                                                dmc.Text("Select dates:", size="sm", fw=500, mb=5),                                            
+                                                dmc.MultiSelect(id="events-date-selector", placeholder="Select maximum 3 dates", data=[], value=[],
+                                                    maxValues=3, size="sm", searchable=True, clearable=True, leftSection=DashIconify(icon="material-symbols:calendar-month", width=20),
+                                                    styles={"dropdown": {"maxHeight": "200px", "overflowY": "auto"}, "input": {"minWidth": "300px"}}),
+                                                dmc.Textarea(
+                                                    id="events-textbox",
+                                                    placeholder="Enter events and notes for selected dates...",
+                                                    autosize=True,
+                                                    minRows=4,
+                                                    maxRows=8,
+                                                    value="Events Summary:\n• Select dates above to track important events\n• Document key milestones and observations\n• Add context for significant changes"
+                                                )
+                                            ], gap="xs")
+                                        ], withBorder=True, inheritPadding=True, py="xs"),
+                                        dmc.CardSection([dmc.Button("Generate Summary", id="generate-summary-btn", variant="filled", size="sm", fullWidth=True)],
+                                            inheritPadding=True, pt="xs")
+                                    ], withBorder=True, shadow="sm", radius="md", mb="md"),
+                                    
+                                    dmc.Card([
+                                        dmc.CardSection([dmc.Title("Summary Metrics", order=6, mb="sm"), html.Div(initial["history-summary-boxes"], id="history-summary-boxes")],
+                                            inheritPadding=True, pt="xs"),
+                                        dmc.CardSection([dmc.Title("Amount Analysis", order=6, mb="sm"), dcc.Graph(id="amount-barchart", figure=initial["amount-barchart"], style={"height": "350px"})],
+                                            inheritPadding=True, pt="xs"),
+                                        dmc.CardSection([dmc.Title("Income Analysis", order=6, mb="sm"), dcc.Graph(id="income-barchart", figure=initial["income-barchart"], style={"height": "350px"})],
+                                            inheritPadding=True, pt="xs"),
+                                        dmc.CardSection([dmc.Title("Return Ratio (Income/Amount)", order=6, mb="sm"), dcc.Graph(id="ratio-chart", figure=initial["ratio-chart"], style={"height": "250px"})],
+                                            inheritPadding=True, pt="xs"),
+                                        dmc.CardSection([
+                                            dmc.Group([
+                                                dmc.Button("Export History Data - Excel", id="history-export-btn", variant="filled", size="sm",
+                                                    leftSection=DashIconify(icon="vscode-icons:file-type-excel", width=20)),
+                                                dmc.Button("Export Charts as PNG", id="history-png-btn", variant="filled", size="sm", 
+                                                    leftSection=DashIconify(icon="mdi:image", width=20)),
+                                            ]),
+                                            dcc.Download(id="download-history-data"),
+                                            dcc.Download(id="download-history-png"),
+                                        ], inheritPadding=True, pt="xs"),
+                                    ], withBorder=True, shadow="sm", radius="md")
+                                ], gap="md")
+                            ]),
+                            dmc.TabsPanel(value="comparison", children=[
+                                dmc.Stack([
+                                    dmc.Card([
+                                        dmc.CardSection([
+                                            dmc.Title("Comparison Controls", order=4, mb="md"),
+                                            dmc.Group([dmc.Stack([dmc.Text("Display Type:", size="sm", fw=500, mb=5),
+                                                dmc.SegmentedControl(id="comparison-type-selector", value="Total", orientation="horizontal", fullWidth=False, color="blue", size="sm",
+                                                    data=[{"value": "Total", "label": "Total"}, {"value": "Best", "label": "Best"},
+                                                        {"value": "Type1", "label": "Type 1"}, {"value": "Type2", "label": "Type 2"}, {"value": "Type3", "label": "Type 3"}])],
+                                                gap="xs", style={"flex": 1})], justify="flex-start", align="flex-start", mb="lg"),
+                                            dmc.Group([dmc.Stack([dmc.Text("Select Dates for Comparison:", size="sm", fw=500, mb=5),
+                                                dmc.MultiSelect(id="comparison-date-selector", placeholder="Select exactly 2 dates to compare", data=_COMPARISON_DATE_OPTIONS, value=[],
+                                                    maxValues=2, size="sm", searchable=True, clearable=True, leftSection=DashIconify(icon="material-symbols:calendar-month", width=20),
+                                                    styles={"dropdown": {"maxHeight": "200px", "overflowY": "auto"}, "input": {"minWidth": "300px"}})],
+                                                gap="xs", style={"flex": 1})], justify="flex-start", align="flex-start", mb="lg"),
+                                            dmc.Grid([
+                                                dmc.GridCol(span=4, children=[dmc.Text("Filter by:", size="sm", fw=500, mb=5),
+                                                    dmc.Select(id="comparison-filter-selector", placeholder="Select filter", value="none", size="sm",
+                                                        data=[{"value": "none", "label": "No Filter"}, {"value": "Division", "label": "Division"},
+                                                            {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
+                                                dmc.GridCol(span=4, children=[dmc.Text("Stack by:", size="sm", fw=500, mb=5),
+                                                    dmc.Select(id="comparison-stack-selector", placeholder="Select stack variable", value="none", size="sm",
+                                                        data=[{"value": "none", "label": "No Stack"}, {"value": "Division", "label": "Division"},
+                                                            {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
+                                                dmc.GridCol(span=4, children=[dmc.Text("Group by:", size="sm", fw=500, mb=5),
+                                                    dmc.Select(id="comparison-group-selector", placeholder="Select group variable", value="none", size="sm",
+                                                        data=[{"value": "none", "label": "No Grouping"}, {"value": "Division", "label": "Division"},
+                                                            {"value": "Type", "label": "Type"}, {"value": "Item", "label": "Item"}, {"value": "Function", "label": "Function"}])]),
+                                            ], gutter="md", mb="lg"),
+                                            html.Div([dmc.Text("Filter values:", size="sm", fw=500, mb=5),
+                                                dmc.MultiSelect(id="comparison-filter-values-selector", placeholder="Select values", data=[], value=[], size="sm", disabled=True)],
+                                                style={"width": "100%"}),
+                                        ], withBorder=True, inheritPadding=True, py="md"),
+                                    ], withBorder=True, shadow="sm", radius="md", mb="md"),
+                                    dmc.Card([
+                                        dmc.CardSection([dmc.Title("Comparison Notes", order=4, mb="md"),
+                                            dmc.Textarea(id="comparison-textbox", placeholder="Enter your comparison analysis notes here...", autosize=True, minRows=8, maxRows=15,
+                                                value=initial["comparison-textbox"])],
+                                            withBorder=True, inheritPadding=True, py="xs"),
+                                        dmc.CardSection([dmc.Button("Save Comparison", id="save-comparison-btn", variant="filled", size="sm", fullWidth=True)],
+                                            inheritPadding=True, pt="xs")
+                                    ], withBorder=True, shadow="sm", radius="md", mb="md"),
+                                    dmc.Card([
+                                        dmc.CardSection([dmc.Title("Comparison Metrics", order=6, mb="sm"), html.Div(initial["comparison-value-boxes"], id="comparison-value-boxes")],
+                                            inheritPadding=True, pt="xs"),
+                                        dmc.CardSection([dmc.Grid([
+                                            dmc.GridCol([dmc.Title("Amount Total Comparison", order=6, mb="sm"), dcc.Graph(id="comparison-var1-chart", figure=initial["comparison-var1-chart"], style={"height": "300px"})], span=6),
+                                            dmc.GridCol([dmc.Title("Income Total Comparison", order=6, mb="sm"), dcc.Graph(id="comparison-var2-chart", figure=initial["comparison-var2-chart"], style={"height": "300px"})], span=6),
                                         ], gutter="md")], inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([
-                                        dmc.Group([
-                                            dmc.Button("Export Comparison Data - Excel", id="export-excel-btn", variant="filled", size="sm",
-                                                leftSection=DashIconify(icon="vscode-icons:file-type-excel", width=20)),
-                                            dmc.Button("Export Charts as PNG", id="comparison-png-btn", variant="filled", size="sm",
-                                                leftSection=DashIconify(icon="mdi:image", width=20)),
-                                        ]),
-                                        dcc.Download(id="download-dataframe-xlsx"),
-                                        dcc.Download(id="download-comparison-png"),
-                                    ], inheritPadding=True, pt="xs"),
-                                ], withBorder=True, shadow="sm", radius="md")
-                            ], gap="md")
-                        ]),
-                        dmc.TabsPanel(value="tool", children=[
-                            dmc.Stack([
-                                dmc.Card([
-                                    dmc.CardSection([
-                                        dmc.Title("Tool Controls", order=4, mb="md"),
-                                        dmc.Stack([
-                                            dmc.Text("Year Range:", size="sm", fw=500, mb=5),
-                                            dmc.RangeSlider(
-                                                id="tool-year-range-slider",
-                                                min=min_year,
-                                                max=max_year,
-                                                step=1,
-                                                value=[min_year, max_year],
-                                                marks=[{"value": year, "label": str(year)} for year in range(min_year, max_year + 1)],
-                                                mb="md",
-                                                minRange=1,
-                                                size="md",
-                                                style={"width": "100%"}
-                                            )
-                                        ], gap="xs", mb="lg"),
-                                        dmc.Grid([
-                                            dmc.GridCol(span=4, children=[
-                                                dmc.Text("Filter by Division:", size="sm", fw=500, mb=5),
-                                                dmc.Select(id="tool-division-filter", placeholder="Select Division", value="none", size="sm",
-                                                    data=[{"value": "none", "label": "All Divisions"}] + 
-                                                        [{"value": val, "label": val} for val in sorted(sample_data['Division'].unique())])
+                                        dmc.CardSection([dmc.Title("Proportion Changes Analysis", order=6, mb="sm"),
+                                            dmc.Grid([
+                                                dmc.GridCol([dmc.Title("Amount Total Proportion Changes", order=6, mb="sm"), dcc.Graph(id="var1-dumbbell-chart", figure=initial["var1-dumbbell-chart"], style={"height": "350px"})], span=6),
+                                                dmc.GridCol([dmc.Title("Income Total Proportion Changes", order=6, mb="sm"), dcc.Graph(id="var2-dumbbell-chart", figure=initial["var2-dumbbell-chart"], style={"height": "350px"})], span=6),
+                                            ], gutter="md")], inheritPadding=True, pt="xs"),
+                                        dmc.CardSection([dmc.Title("Division Percentage Contribution", order=6, mb="sm"),
+                                            dmc.Grid([
+                                                dmc.GridCol([dmc.Title("Amount by Division", order=6, mb="sm"), dcc.Graph(id="amount-division-chart", figure=initial["amount-division-chart"], style={"height": "350px"})], span=6),
+                                                dmc.GridCol([dmc.Title("Income by Division", order=6, mb="sm"), dcc.Graph(id="income-division-chart", figure=initial["income-division-chart"], style={"height": "350px"})], span=6),
+                                            ], gutter="md")], inheritPadding=True, pt="xs"),
+                                        dmc.CardSection([dmc.Title("Type 2 Breakdown (WW / DP / PP)", order=6, mb="sm"),
+                                            dmc.Grid([
+                                                dmc.GridCol([dmc.Title("Amount Breakdown", order=6, mb="sm"), dcc.Graph(id="type2-amount-chart", figure=initial["type2-amount-chart"], style={"height": "350px"})], span=6),
+                                                dmc.GridCol([dmc.Title("Income Breakdown", order=6, mb="sm"), dcc.Graph(id="type2-income-chart", figure=initial["type2-income-chart"], style={"height": "350px"})], span=6),
+                                            ], gutter="md")], inheritPadding=True, pt="xs"),
+                                        dmc.CardSection([
+                                            dmc.Group([
+                                                dmc.Button("Export Comparison Data - Excel", id="export-excel-btn", variant="filled", size="sm",
+                                                    leftSection=DashIconify(icon="vscode-icons:file-type-excel", width=20)),
+                                                dmc.Button("Export Charts as PNG", id="comparison-png-btn", variant="filled", size="sm",
+                                                    leftSection=DashIconify(icon="mdi:image", width=20)),
                                             ]),
-                                            dmc.GridCol(span=4, children=[
-                                                dmc.Text("Filter by Item:", size="sm", fw=500, mb=5),
-                                                dmc.Select(id="tool-item-filter", placeholder="Select Item", value="none", size="sm",
-                                                    data=[{"value": "none", "label": "All Items"}] + 
-                                                        [{"value": val, "label": val} for val in sorted(sample_data['Item'].unique())])
+                                            dcc.Download(id="download-dataframe-xlsx"),
+                                            dcc.Download(id="download-comparison-png"),
+                                        ], inheritPadding=True, pt="xs"),
+                                    ], withBorder=True, shadow="sm", radius="md")
+                                ], gap="md")
+                            ]),
+                            dmc.TabsPanel(value="tool", children=[
+                                dmc.Stack([
+                                    dmc.Card([
+                                        dmc.CardSection([
+                                            dmc.Title("Tool Controls", order=4, mb="md"),
+                                            dmc.Stack([
+                                                dmc.Text("Year Range:", size="sm", fw=500, mb=5),
+                                                dmc.RangeSlider(
+                                                    id="tool-year-range-slider",
+                                                    updatemode="mouseup",
+                                                    min=min_year,
+                                                    max=max_year,
+                                                    step=1,
+                                                    value=[min_year, max_year],
+                                                    marks=[{"value": year, "label": str(year)} for year in range(min_year, max_year + 1)],
+                                                    mb="md",
+                                                    minRange=1,
+                                                    size="md",
+                                                    style={"width": "100%"}
+                                                )
+                                            ], gap="xs", mb="lg"),
+                                            dmc.Grid([
+                                                dmc.GridCol(span=4, children=[
+                                                    dmc.Text("Filter by Division:", size="sm", fw=500, mb=5),
+                                                    dmc.Select(id="tool-division-filter", placeholder="Select Division", value="none", size="sm",
+                                                        data=[{"value": "none", "label": "All Divisions"}] + 
+                                                            _FILTER_OPTIONS['Division'][0])
+                                                ]),
+                                                dmc.GridCol(span=4, children=[
+                                                    dmc.Text("Filter by Item:", size="sm", fw=500, mb=5),
+                                                    dmc.Select(id="tool-item-filter", placeholder="Select Item", value="none", size="sm",
+                                                        data=[{"value": "none", "label": "All Items"}] + 
+                                                            _FILTER_OPTIONS['Item'][0])
+                                                ]),
+                                                dmc.GridCol(span=4, children=[
+                                                    dmc.Text("Filter by Function:", size="sm", fw=500, mb=5),
+                                                    dmc.Select(id="tool-function-filter", placeholder="Select Function", value="none", size="sm",
+                                                        data=[{"value": "none", "label": "All Functions"}] + 
+                                                            _FILTER_OPTIONS['Function'][0])
+                                                ]),
+                                            ], gutter="md", mb="lg"),
+                                        ], withBorder=True, inheritPadding=True, py="md"),
+                                    ], withBorder=True, shadow="sm", radius="md", mb="md"),
+                                    
+                                    dmc.Card([
+                                        dmc.CardSection([
+                                            dmc.Title("Income Analysis: Original vs Corrected", order=4, mb="md"),
+                                            dcc.Graph(id="tool-income-chart", figure=initial["tool-income-chart"], style={"height": "500px"})
+                                        ], inheritPadding=True, pt="xs"),
+                                        dmc.CardSection([
+                                            dmc.Group([
+                                                dmc.Button("Export Tool Data - Excel", id="tool-export-btn", variant="filled", size="sm",
+                                                    leftSection=DashIconify(icon="vscode-icons:file-type-excel", width=20)),
+                                                dmc.Button("Export Charts as PNG", id="tool-png-btn", variant="filled", size="sm",
+                                                    leftSection=DashIconify(icon="mdi:image", width=20)),
                                             ]),
-                                            dmc.GridCol(span=4, children=[
-                                                dmc.Text("Filter by Function:", size="sm", fw=500, mb=5),
-                                                dmc.Select(id="tool-function-filter", placeholder="Select Function", value="none", size="sm",
-                                                    data=[{"value": "none", "label": "All Functions"}] + 
-                                                        [{"value": val, "label": val} for val in sorted(sample_data['Function'].unique())])
+                                            dcc.Download(id="download-tool-data"),
+                                            dcc.Download(id="download-tool-png"),
+                                        ], inheritPadding=True, pt="xs"),
+                                    ], withBorder=True, shadow="sm", radius="md")
+                                ], gap="md")
+                            ]),
+                        ])
+                    ]),
+                    html.Div(id="scenario-content", style={"display": "none"}, children=[
+                        dmc.Tabs(value="scenario_probability", id="scenario-tabs", children=[
+                            dmc.TabsList([
+                                dmc.TabsTab("Scenario Probability", value="scenario_probability"),
+                                dmc.TabsTab("Prediction", value="prediction"),
+                            ]),
+                            dmc.TabsPanel(value="scenario_probability", children=[
+                                dmc.Stack([
+                                    dmc.Card([
+                                        dmc.CardSection([
+                                            dmc.Title("Scenario Probability Controls", order=4, mb="md"),
+                                            dmc.Stack([
+                                                dmc.Text("Year Range:", size="sm", fw=500, mb=5),
+                                                dmc.RangeSlider(
+                                                    id="scenario-year-range-slider",
+                                                    updatemode="mouseup",
+                                                    min=min_year,
+                                                    max=max_year,
+                                                    step=1,
+                                                    value=[min_year, max_year],
+                                                    marks=[{"value": year, "label": str(year)} for year in range(min_year, max_year + 1)],
+                                                    mb="md",
+                                                    minRange=1,
+                                                    size="md",
+                                                    style={"width": "100%"}
+                                                )
+                                            ], gap="xs", mb="lg"),
+                                        ], withBorder=True, inheritPadding=True, py="md"),
+                                    ], withBorder=True, shadow="sm", radius="md", mb="md"),
+                                    
+                                    dmc.Card([
+                                        dmc.CardSection([
+                                            dmc.Title("Scenario Weight Distribution", order=4, mb="md"),
+                                            dcc.Graph(id="scenario-weight-chart", figure=initial["scenario-weight-chart"], style={"height": "500px"})
+                                        ], inheritPadding=True, pt="xs"),
+                                        dmc.CardSection([
+                                            dmc.Group([
+                                                dmc.Button("Export Scenario Data - Excel", id="scenario-export-btn", variant="filled", size="sm",
+                                                    leftSection=DashIconify(icon="vscode-icons:file-type-excel", width=20)),
+                                                dmc.Button("Export Chart as PNG", id="scenario-png-btn", variant="filled", size="sm",
+                                                    leftSection=DashIconify(icon="mdi:image", width=20)),
                                             ]),
-                                        ], gutter="md", mb="lg"),
-                                    ], withBorder=True, inheritPadding=True, py="md"),
-                                ], withBorder=True, shadow="sm", radius="md", mb="md"),
-                                
-                                dmc.Card([
-                                    dmc.CardSection([
-                                        dmc.Title("Income Analysis: Original vs Corrected", order=4, mb="md"),
-                                        dcc.Graph(id="tool-income-chart", style={"height": "500px"})
-                                    ], inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([
-                                        dmc.Group([
-                                            dmc.Button("Export Tool Data - Excel", id="tool-export-btn", variant="filled", size="sm",
-                                                leftSection=DashIconify(icon="vscode-icons:file-type-excel", width=20)),
-                                            dmc.Button("Export Charts as PNG", id="tool-png-btn", variant="filled", size="sm",
-                                                leftSection=DashIconify(icon="mdi:image", width=20)),
-                                        ]),
-                                        dcc.Download(id="download-tool-data"),
-                                        dcc.Download(id="download-tool-png"),
-                                    ], inheritPadding=True, pt="xs"),
-                                ], withBorder=True, shadow="sm", radius="md")
-                            ], gap="md")
-                        ]),
-                    ])
-                ]),
-                html.Div(id="scenario-content", style={"display": "none"}, children=[
-                    dmc.Tabs(value="scenario_probability", id="scenario-tabs", children=[
-                        dmc.TabsList([
-                            dmc.TabsTab("Scenario Probability", value="scenario_probability"),
-                            dmc.TabsTab("Prediction", value="prediction"),
-                        ]),
-                        dmc.TabsPanel(value="scenario_probability", children=[
-                            dmc.Stack([
-                                dmc.Card([
-                                    dmc.CardSection([
-                                        dmc.Title("Scenario Probability Controls", order=4, mb="md"),
-                                        dmc.Stack([
-                                            dmc.Text("Year Range:", size="sm", fw=500, mb=5),
-                                            dmc.RangeSlider(
-                                                id="scenario-year-range-slider",
-                                                min=min_year,
-                                                max=max_year,
-                                                step=1,
-                                                value=[min_year, max_year],
-                                                marks=[{"value": year, "label": str(year)} for year in range(min_year, max_year + 1)],
-                                                mb="md",
-                                                minRange=1,
-                                                size="md",
-                                                style={"width": "100%"}
-                                            )
-                                        ], gap="xs", mb="lg"),
-                                    ], withBorder=True, inheritPadding=True, py="md"),
-                                ], withBorder=True, shadow="sm", radius="md", mb="md"),
-                                
-                                dmc.Card([
-                                    dmc.CardSection([
-                                        dmc.Title("Scenario Weight Distribution", order=4, mb="md"),
-                                        dcc.Graph(id="scenario-weight-chart", style={"height": "500px"})
-                                    ], inheritPadding=True, pt="xs"),
-                                    dmc.CardSection([
-                                        dmc.Group([
-                                            dmc.Button("Export Scenario Data - Excel", id="scenario-export-btn", variant="filled", size="sm",
-                                                leftSection=DashIconify(icon="vscode-icons:file-type-excel", width=20)),
-                                            dmc.Button("Export Chart as PNG", id="scenario-png-btn", variant="filled", size="sm",
-                                                leftSection=DashIconify(icon="mdi:image", width=20)),
-                                        ]),
-                                        dcc.Download(id="download-scenario-data"),
-                                        dcc.Download(id="download-scenario-png"),
-                                    ], inheritPadding=True, pt="xs"),
-                                ], withBorder=True, shadow="sm", radius="md")
-                            ], gap="md")
-                        ]),
-                        dmc.TabsPanel(value="prediction", children=[
-                            dmc.Center([dmc.Stack([dmc.Title("Prediction Page", order=2), 
-                                dmc.Text("This page is ready for prediction analysis implementation.", c="dimmed")],
-                                align="center")], style={"height": "400px"})
-                        ]),
+                                            dcc.Download(id="download-scenario-data"),
+                                            dcc.Download(id="download-scenario-png"),
+                                        ], inheritPadding=True, pt="xs"),
+                                    ], withBorder=True, shadow="sm", radius="md")
+                                ], gap="md")
+                            ]),
+                            dmc.TabsPanel(value="prediction", children=[
+                                dmc.Center([dmc.Stack([dmc.Title("Prediction Page", order=2), 
+                                    dmc.Text("This page is ready for prediction analysis implementation.", c="dimmed")],
+                                    align="center")], style={"height": "400px"})
+                            ]),
+                        ])
                     ])
                 ])
-            ])
-        ]
-    )]
-)
+            ]
+        ),
+        # Filter MultiSelect options per grouping column, read by the clientside filter callbacks
+        dcc.Store(id="filter-catalog", data={col: {"options": options, "values": values} for col, (options, values) in _FILTER_OPTIONS.items()})]
+    )
 
 # ============================================================================
 # CALLBACKS
 # ============================================================================
-@callback(
+# Filter values are a pure lookup into the filter-catalog store, so they are filled in the browser without a round trip
+_FILTER_VALUES_JS = """
+function(filterVar, catalog) {
+    const entry = catalog[filterVar];
+    return entry ? [entry.options, false, entry.values] : [[], true, []];
+}
+"""
+
+# Toggle between the Today and Scenario pages in the browser; the layout already renders Today, so no initial call
+app.clientside_callback(
+    """
+    function(todayClicks, scenarioClicks) {
+        const triggered = dash_clientside.callback_context.triggered;
+        const today = !triggered.length || triggered[0].prop_id.split(".")[0] !== "nav-scenario";
+        return [{display: today ? "block" : "none"}, {display: today ? "none" : "block"}, today, !today];
+    }
+    """,
     [Output("today-content", "style"), Output("scenario-content", "style"),
      Output("nav-today", "active"), Output("nav-scenario", "active")],
     [Input("nav-today", "n_clicks"), Input("nav-scenario", "n_clicks")],
-    prevent_initial_call=False
+    prevent_initial_call=True
 )
-def toggle_navigation(today_clicks, scenario_clicks):
-    """Toggle between Today and Scenario navigation pages"""
-    ctx = dash.callback_context
-    
-    if not ctx.triggered:
-        # Initial load - show Today
-        return {"display": "block"}, {"display": "none"}, True, False
-    
-    button_id = ctx.triggered[0]["prop_id"].split(".")[0]
-    
-    if button_id == "nav-scenario":
-        return {"display": "none"}, {"display": "block"}, False, True
-    else:
-        return {"display": "block"}, {"display": "none"}, True, False
-
-@callback([Output("filter-values-selector", "data"), Output("filter-values-selector", "disabled"), Output("filter-values-selector", "value")],
-    [Input("filter-selector", "value")])
-def update_filter_values(filter_var):
-    if filter_var == "none":
-        return [], True, []
-    if filter_var in ['Division', 'Type', 'Item', 'Function']:
-        unique_values = sample_data[filter_var].unique()
-        options = [{"value": val, "label": val} for val in sorted(unique_values)]
-        return options, False, list(unique_values)
-    return [], True, []
-
-@callback([Output("history-summary-boxes", "children"), Output("amount-barchart", "figure"), Output("income-barchart", "figure"), Output("ratio-chart", "figure")],
-    [Input("variable-selector", "value"), Input("filter-selector", "value"), Input("filter-values-selector", "value"),
-     Input("stack-selector", "value"), Input("group-selector", "value"), Input("year-range-slider", "value")])
-def update_barcharts(selected_type, filter_var, filter_values, stack_var, group_var, year_range):
-    if selected_type == "Total":
-        amount_col, income_col = "Amount_total", "Income_total"
-    elif selected_type == "Best":
-        # Best = Type1 + Type2
-        amount_col, income_col = "Amount_Best", "Income_Best"
-    elif selected_type == "Type1":
-        amount_col, income_col = "Amount_1", "Income_1"
-    elif selected_type == "Type2":
-        amount_col, income_col = "Amount_2", "Income_2"
-    else:
-        amount_col, income_col = "Amount_3", "Income_3"
-    
-    df = sample_data.copy()
-    
-    # Create Best columns if needed
-    if selected_type == "Best":
-        df['Amount_Best'] = df['Amount_1'] + df['Amount_2']
-        df['Income_Best'] = df['Income_1'] + df['Income_2']
-    
-    df = df[(df['date'].dt.year >= year_range[0]) & (df['date'].dt.year <= year_range[1])]
-    if filter_var != "none" and filter_var in df.columns and filter_values:
-        df = df[df[filter_var].isin(filter_values)]
-    df['month'] = df['date'].dt.to_period('M').astype(str)
-    
-    monthly_totals = df.groupby('month').agg({amount_col: 'sum', income_col: 'sum'}).reset_index()
+
+app.clientside_callback(_FILTER_VALUES_JS,
+    [Output("filter-values-selector", "data"), Output("filter-values-selector", "disabled"), Output("filter-values-selector", "value")],
+    [Input("filter-selector", "value")], [State("filter-catalog", "data")], prevent_initial_call=True)
+
+# History summary cards depend only on type, filter and years, so stack/group toggles leave them alone
+@functools.lru_cache(maxsize=64)
+def _history_summary_cached(selected_type, filter_var, filter_values, year_range):
+    amount_col, income_col = get_comparison_columns(selected_type)
+    monthly_totals = monthly_rollup([amount_col, income_col], year_range, filter_var, filter_values)
     avg_amount = monthly_totals[amount_col].mean()
     avg_income = monthly_totals[income_col].mean()
     avg_ratio = (monthly_totals[income_col].sum() / monthly_totals[amount_col].sum()) if monthly_totals[amount_col].sum() != 0 else 0
     
-    summary_boxes = dmc.SimpleGrid([
+    return dmc.SimpleGrid([
         dmc.Card([dmc.Stack([dmc.Text(f"Average Amount - {selected_type}", size="sm", c="dimmed"),
             dmc.Text(format_number(avg_amount), size="xl", fw=700, c="blue"), dmc.Text("Monthly average", size="xs", c="dimmed")],
             gap="xs")], withBorder=True, shadow="sm", radius="md", p="md"),
@@ -920,170 +1481,175 @@ def update_barcharts(selected_type, filter_var, filter_values, stack_var, group_
             dmc.Text(f"{avg_ratio*100:.2f}%", size="xl", fw=700, c="green"), dmc.Text("Income/Amount ratio", size="xs", c="dimmed")],
             gap="xs")], withBorder=True, shadow="sm", radius="md", p="md"),
     ], cols=3, spacing="sm", mb="lg")
+
+# Whole History chart outputs keyed by the control values, so repeated selections skip the groupbys and figure builds
+@functools.lru_cache(maxsize=64)
+def _history_charts_cached(selected_type, filter_var, filter_values, stack_var, group_var, year_range):
+    amount_col, income_col = get_comparison_columns(selected_type)
+    
+    # Every chart reads the import-time monthly rollups; no row-level groupby happens per request
+    monthly_totals = monthly_rollup([amount_col, income_col], year_range, filter_var, filter_values)
+    
+    @functools.cache
+    def category_totals(category_var):
+        """(month, category) sums of both metrics, shared by the Amount, Income and ratio charts"""
+        return category_monthly_rollup([amount_col, income_col], category_var, year_range, filter_var, filter_values)
     
     def create_bar_chart(variable_col, title):
-        fig = go.Figure()
-        if stack_var != "none" and stack_var in df.columns and stack_var in ['Division', 'Type', 'Item', 'Function']:
-            stacked_data = df.groupby(['month', stack_var])[variable_col].sum().unstack(fill_value=0)
+        traces, barmode = [], None
+        if stack_var in _VALID_GROUPS:
+            stacked_data = category_totals(stack_var)[variable_col].unstack(fill_value=0)
             colors = get_color_sequence('stacked', len(stacked_data.columns))
             for i, category in enumerate(stacked_data.columns):
                 hover_text = [format_hover_value(v) for v in stacked_data[category]]
                 # Format dates as Month-Year (e.g., "Apr-2023")
                 hover_dates = [pd.to_datetime(str(m)).strftime('%b-%Y') for m in stacked_data.index]
-                fig.add_trace(go.Bar(x=stacked_data.index, y=stacked_data[category], name=f"{category}",
-                    marker_color=colors[i],
-                    text=[format_number(v) for v in stacked_data[category]], textposition='auto',
+                traces.append(dict(type='bar', x=stacked_data.index, y=stacked_data[category], name=f"{category}",
+                    marker=dict(color=colors[i]),
                     customdata=list(zip(hover_dates, hover_text)),
                     hovertemplate='<b>%{customdata[0]}</b><br>' + f'{category}<br>' + 'Value: %{customdata[1]}<extra></extra>'))
-            fig.update_layout(barmode='stack')
-        elif group_var != "none" and group_var in df.columns and group_var in ['Division', 'Type', 'Item', 'Function']:
-            categories = sorted(df[group_var].unique())
+            barmode = 'stack'
+        elif group_var in _VALID_GROUPS:
+            totals = category_totals(group_var)
+            categories = totals.index.remove_unused_levels().levels[1]
             colors = get_color_sequence('grouped', len(categories))
             for i, category in enumerate(categories):
-                category_data = df[df[group_var] == category]
-                monthly_data = category_data.groupby('month')[variable_col].sum().reset_index()
+                monthly_data = totals.xs(category, level=1).reset_index()
                 hover_text = [format_hover_value(v) for v in monthly_data[variable_col]]
                 hover_dates = [pd.to_datetime(str(m)).strftime('%b-%Y') for m in monthly_data['month']]
-                fig.add_trace(go.Bar(x=monthly_data['month'], y=monthly_data[variable_col], name=f"{category}",
-                    marker_color=colors[i],
-                    text=[format_number(v) for v in monthly_data[variable_col]], textposition='auto',
+                traces.append(dict(type='bar', x=monthly_data['month'], y=monthly_data[variable_col], name=f"{category}",
+                    marker=dict(color=colors[i]),
                     customdata=list(zip(hover_dates, hover_text)),
                     hovertemplate='<b>%{customdata[0]}</b><br>' + f'{category}<br>' + 'Value: %{customdata[1]}<extra></extra>'))
-            fig.update_layout(barmode='group')
+            barmode = 'group'
         else:
-            monthly_data = df.groupby('month')[variable_col].sum().reset_index()
+            monthly_data = monthly_totals.reset_index()
             hover_text = [format_hover_value(v) for v in monthly_data[variable_col]]
             hover_dates = [pd.to_datetime(str(m)).strftime('%b-%Y') for m in monthly_data['month']]
-            fig.add_trace(go.Bar(x=monthly_data['month'], y=monthly_data[variable_col], name=title,
-                marker_color=get_color_sequence('bar', 1)[0],
-                text=[format_number(v) for v in monthly_data[variable_col]], textposition='auto',
+            traces.append(dict(type='bar', x=monthly_data['month'], y=monthly_data[variable_col], name=title,
+                marker=dict(color=get_color_sequence('bar', 1)[0]),
                 customdata=list(zip(hover_dates, hover_text)),
                 hovertemplate='<b>%{customdata[0]}</b><br>Value: %{customdata[1]}<extra></extra>'))
         
         all_values = []
-        for trace in fig.data:
-            all_values.extend([v for v in trace.y if v is not None])
+        for trace in traces:
+            all_values.extend([v for v in trace['y'] if v is not None])
         max_val = max(all_values) if all_values else 0
         
         if max_val >= 1e9:
-            fig.update_yaxes(tickformat=".2s", title_text="Value (Billions)")
+            yaxis = dict(tickformat=".2s", title=dict(text="Value (Billions)"))
         elif max_val >= 1e6:
-            fig.update_yaxes(tickformat=".2s", title_text="Value (Millions)")
+            yaxis = dict(tickformat=".2s", title=dict(text="Value (Millions)"))
         elif max_val >= 1e3:
-            fig.update_yaxes(tickformat=".2s", title_text="Value (Thousands)")
+            yaxis = dict(tickformat=".2s", title=dict(text="Value (Thousands)"))
         else:
-            fig.update_yaxes(title_text="Value")
-            
-        fig.update_layout(title=title, xaxis_title="Month", template="plotly_white",
-            showlegend=True, height=350, margin=dict(l=50, r=50, t=60, b=50))
-        fig.update_xaxes(tickangle=45)
-        return fig
+            yaxis = dict(title=dict(text="Value"))
+        
+        # No per-bar text labels: the browser lays them out per bar and per trace on every render. Only the five
+        # largest month totals of stacked/single bars are labelled, in one annotation batch
+        annotations = []
+        if barmode != 'group' and traces:
+            month_totals = pd.Series(np.sum([np.asarray(t['y'], dtype=float) for t in traces], axis=0), index=list(traces[0]['x']))
+            annotations = [dict(x=month, y=total, text=format_number(total), showarrow=False, yanchor='bottom')
+                for month, total in month_totals.nlargest(5).items()]
+        
+        # Zoom/pan survives updates until the breakdown dimension changes
+        layout = dict(_HISTORY_BAR_LAYOUT_JSON, title=dict(text=title), yaxis=yaxis, annotations=annotations,
+            uirevision=stack_var if barmode == 'stack' else group_var)
+        if barmode:
+            layout['barmode'] = barmode
+        # Plain figure dicts skip plotly's per-property validation, like the comparison bars
+        fig = {'data': traces, 'layout': layout}
+        return plain_figure(go.Figure(fig) if _VALIDATE_FIGURES else fig)
     
     amount_chart = create_bar_chart(amount_col, f"Amount - {selected_type}")
     income_chart = create_bar_chart(income_col, f"Income - {selected_type}")
     
-    ratio_fig = go.Figure()
-    if group_var != "none" and group_var in df.columns and group_var in ['Division', 'Type', 'Item', 'Function']:
-        categories = sorted(df[group_var].unique())
+    ratio_traces = []
+    if group_var in _VALID_GROUPS:
+        totals = category_totals(group_var)
+        categories = totals.index.remove_unused_levels().levels[1]
         colors = get_color_sequence('line', len(categories))
         for i, category in enumerate(categories):
-            category_data = df[df[group_var] == category]
-            monthly_data = category_data.groupby('month').agg({amount_col: 'sum', income_col: 'sum'}).reset_index()
+            monthly_data = totals.xs(category, level=1).reset_index()
             monthly_data['ratio'] = (monthly_data[income_col] / monthly_data[amount_col].replace(0, np.nan)) * 100
             hover_dates = [pd.to_datetime(str(m)).strftime('%b-%Y') for m in monthly_data['month']]
-            ratio_fig.add_trace(go.Scatter(x=monthly_data['month'], y=monthly_data['ratio'],
+            ratio_traces.append(go.Scatter(x=monthly_data['month'], y=monthly_data['ratio'],
                 mode='lines+markers', name=f"{category}", line=dict(color=colors[i], width=2), marker=dict(size=6),
                 customdata=list(zip(hover_dates, monthly_data['ratio'])),
                 hovertemplate='<b>%{customdata[0]}</b><br>' + f'{category}<br>' + 'Ratio: %{customdata[1]:.2f}%<extra></extra>'))
     else:
-        monthly_data = df.groupby('month').agg({amount_col: 'sum', income_col: 'sum'}).reset_index()
+        monthly_data = monthly_totals.reset_index()
         monthly_data['ratio'] = (monthly_data[income_col] / monthly_data[amount_col].replace(0, np.nan)) * 100
         hover_dates = [pd.to_datetime(str(m)).strftime('%b-%Y') for m in monthly_data['month']]
-        ratio_fig.add_trace(go.Scatter(x=monthly_data['month'], y=monthly_data['ratio'],
+        ratio_traces.append(go.Scatter(x=monthly_data['month'], y=monthly_data['ratio'],
             mode='lines+markers', name='Return Ratio', line=dict(color=get_color_sequence('line', 1)[0], width=3), marker=dict(size=8),
             customdata=list(zip(hover_dates, monthly_data['ratio'])),
             hovertemplate='<b>%{customdata[0]}</b><br>Ratio: %{customdata[1]:.2f}%<extra></extra>'))
     
-    ratio_fig.update_layout(title=f"Return Ratio (Income/Amount) - {selected_type}", xaxis_title="Month", yaxis_title="Ratio (%)",
-        template="plotly_white", height=250, margin=dict(l=50, r=120, t=60, b=50), showlegend=True,
-        legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.02))
-    ratio_fig.update_xaxes(tickangle=45)
-    ratio_fig.update_yaxes(ticksuffix="%")
+    # Traces and layout go through one constructor, so the figure is validated once instead of per add/update call
+    ratio_fig = go.Figure(data=ratio_traces, layout=dict(title=f"Return Ratio (Income/Amount) - {selected_type}",
+        xaxis=dict(title="Month", tickangle=45), yaxis=dict(title="Ratio (%)", ticksuffix="%"),
+        template="plotly_white", height=250, margin=dict(l=50, r=120, t=60, b=50), showlegend=True, uirevision=group_var,
+        legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.02)))
     
-    return summary_boxes, amount_chart, income_chart, ratio_fig
+    # Cached as a plain dict like the bar charts, so hits skip the Figure-to-JSON conversion
+    return amount_chart, income_chart, plain_figure(ratio_fig)
 
-@callback(Output("comparison-date-selector", "data"), Input("main-tabs", "value"))
-def populate_comparison_dates(active_tab):
-    if active_tab == "comparison":
-        unique_dates = sorted(sample_data['date'].dt.to_period('M').unique())
-        return [{"value": str(date), "label": str(date)} for date in unique_dates]
-    return []
+# filter-selector is State: every change to it rewrites filter-values-selector, which re-fires these callbacks once
+@callback(Output("history-summary-boxes", "children"),
+    [Input("variable-selector", "value"), State("filter-selector", "value"), Input("filter-values-selector", "value"),
+     Input("year-range-slider", "value")],
+    prevent_initial_call=True)
+def update_history_summary(selected_type, filter_var, filter_values, year_range):
+    return _history_summary_cached(selected_type, filter_var, tuple(filter_values or ()), tuple(year_range))
 
-@callback(
+def _triggered_only_by(*prop_ids):
+    """True when the running callback was fired by the given props alone (False outside a request)"""
+    try:
+        triggered = dash.callback_context.triggered_prop_ids
+    except dash.exceptions.MissingCallbackContextException:
+        return False
+    return bool(triggered) and set(triggered) <= set(prop_ids)
+
+@callback([Output("amount-barchart", "figure"), Output("income-barchart", "figure"), Output("ratio-chart", "figure")],
+    [Input("variable-selector", "value"), State("filter-selector", "value"), Input("filter-values-selector", "value"),
+     Input("stack-selector", "value"), Input("group-selector", "value"), Input("year-range-slider", "value")],
+    prevent_initial_call=True)
+def update_barcharts(selected_type, filter_var, filter_values, stack_var, group_var, year_range):
+    amount_chart, income_chart, ratio_chart = _history_charts_cached(
+        selected_type, filter_var, tuple(filter_values or ()), stack_var, group_var, tuple(year_range))
+    # The ratio chart ignores the stack selector, and the bar charts ignore grouping while a stack is set;
+    # leave untouched figures alone so the browser neither receives nor re-renders them
+    if _triggered_only_by("stack-selector.value"):
+        return amount_chart, income_chart, dash.no_update
+    if stack_var in _VALID_GROUPS and _triggered_only_by("group-selector.value"):
+        return dash.no_update, dash.no_update, ratio_chart
+    return amount_chart, income_chart, ratio_chart
+
+app.clientside_callback(_FILTER_VALUES_JS,
     [Output("comparison-filter-values-selector", "data"), Output("comparison-filter-values-selector", "disabled"), 
      Output("comparison-filter-values-selector", "value")],
-    [Input("comparison-filter-selector", "value")]
-)
-def update_comparison_filter_values(filter_var):
-    if filter_var == "none":
-        return [], True, []
-    if filter_var in ['Division', 'Type', 'Item', 'Function']:
-        unique_values = sample_data[filter_var].unique()
-        options = [{"value": val, "label": val} for val in sorted(unique_values)]
-        return options, False, list(unique_values)
-    return [], True, []
+    [Input("comparison-filter-selector", "value")], [State("filter-catalog", "data")], prevent_initial_call=True)
 
 @callback(
-    [Output("comparison-value-boxes", "children"), Output("comparison-var1-chart", "figure"), 
-     Output("comparison-var2-chart", "figure"), Output("var1-dumbbell-chart", "figure"), 
-     Output("var2-dumbbell-chart", "figure"), Output("amount-division-chart", "figure"),
-     Output("income-division-chart", "figure"), Output("type2-amount-chart", "figure"),
-     Output("type2-income-chart", "figure"), Output("comparison-textbox", "value")],
+    [Output("comparison-value-boxes", "children"), Output("amount-division-chart", "figure"),
+     Output("income-division-chart", "figure")],
     [Input("comparison-type-selector", "value"), Input("comparison-date-selector", "value"), 
-     Input("comparison-filter-selector", "value"), Input("comparison-filter-values-selector", "value"),
-     Input("comparison-stack-selector", "value"), Input("comparison-group-selector", "value")]
+     Input("comparison-filter-selector", "value"), Input("comparison-filter-values-selector", "value")],
+    prevent_initial_call=True
 )
-def update_enhanced_comparison_content(selected_type, selected_dates, filter_var, filter_values, stack_var, group_var):
-    if selected_type == "Total":
-        amount_col, income_col = "Amount_total", "Income_total"
-    elif selected_type == "Best":
-        amount_col, income_col = "Amount_Best", "Income_Best"
-    elif selected_type == "Type1":
-        amount_col, income_col = "Amount_1", "Income_1"
-    elif selected_type == "Type2":
-        amount_col, income_col = "Amount_2", "Income_2"
-    else:
-        amount_col, income_col = "Amount_3", "Income_3"
-    
-    empty_fig = go.Figure()
-    empty_fig.update_layout(title="Select 2 dates to compare", template="plotly_white", height=300, showlegend=False)
-    empty_fig.add_annotation(text="Please select exactly 2 dates for comparison", xref="paper", yref="paper",
-        x=0.5, y=0.5, xanchor='center', yanchor='middle', showarrow=False, font=dict(size=14, color="gray"))
-    
-    if not selected_dates or len(selected_dates) != 2:
+def update_comparison_value_boxes(selected_type, selected_dates, filter_var, filter_values):
+    """Metric cards and Division contribution charts (independent of stack/group selectors)"""
+    slices = get_comparison_slices(selected_type, selected_dates, filter_var, filter_values)
+    if slices is None:
+        empty_fig = create_empty_comparison_figure()
         empty_boxes = dmc.Center([dmc.Text("Please select exactly 2 dates to see comparison metrics", c="dimmed", size="sm")], style={"padding": "20px"})
-        default_text = "Comparison Analysis:\n\n• Select exactly 2 dates to compare data\n• Use filters and grouping to focus analysis"
-        return empty_boxes, empty_fig, empty_fig, empty_fig, empty_fig, empty_fig, empty_fig, empty_fig, empty_fig, default_text
+        return empty_boxes, empty_fig, empty_fig
     
-    date1, date2 = sorted([pd.to_datetime(date + '-01') for date in selected_dates])
-    df = sample_data.copy()
-    
-    # Create Best columns if needed
-    if selected_type == "Best":
-        df['Amount_Best'] = df['Amount_1'] + df['Amount_2']
-        df['Income_Best'] = df['Income_1'] + df['Income_2']
-    
-    df_date1 = df[df['date'].dt.to_period('M') == date1.to_period('M')]
-    df_date2 = df[df['date'].dt.to_period('M') == date2.to_period('M')]
-    
-    if filter_var != "none" and filter_var in df.columns and filter_values:
-        df_date1 = df_date1[df_date1[filter_var].isin(filter_values)]
-        df_date2 = df_date2[df_date2[filter_var].isin(filter_values)]
-    
-    amount_old = df_date1[amount_col].sum() if not df_date1.empty else 0
-    amount_new = df_date2[amount_col].sum() if not df_date2.empty else 0
-    income_old = df_date1[income_col].sum() if not df_date1.empty else 0
-    income_new = df_date2[income_col].sum() if not df_date2.empty else 0
+    date1, date2, df_date1, df_date2 = slices
+    amount_col, income_col = get_comparison_columns(selected_type)
+    amount_old, amount_new, income_old, income_new = get_comparison_totals(date1, date2, amount_col, income_col, filter_var, filter_values)
     
     amount_change = ((amount_new - amount_old) / amount_old * 100) if amount_old != 0 else 0
     income_change = ((income_new - income_old) / income_old * 100) if income_old != 0 else 0
@@ -1091,313 +1657,94 @@ def update_enhanced_comparison_content(selected_type, selected_dates, filter_var
     ratio_new = (income_new / amount_new) * 100 if amount_new != 0 else 0
     ratio_difference = ratio_new - ratio_old
     
-    comparison_text = generate_enhanced_comparison_text_updated(amount_old, amount_new, income_old, income_new, date1, date2,
-        filter_var, filter_values, group_var, df_date1, df_date2, selected_type, amount_col, income_col)
-    
     value_boxes = dmc.SimpleGrid([
-        dmc.Card([dmc.Stack([dmc.Text(f"Amount Change - {selected_type}", size="sm", c="dimmed"),
-            dmc.Group([dmc.Text(f"{amount_change:+.1f}%", size="xl", fw=700, c="green" if amount_change >= 0 else "red"),
-                DashIconify(icon="material-symbols:trending-up" if amount_change >= 0 else "material-symbols:trending-down", width=24, color="green" if amount_change >= 0 else "red")],
-                justify="space-between", align="center"),
-            dmc.Text(f"{format_number(amount_old)} → {format_number(amount_new)}", size="xs", c="dimmed")], gap="xs")], withBorder=True, shadow="sm", radius="md", p="md"),
-        dmc.Card([dmc.Stack([dmc.Text(f"Income Change - {selected_type}", size="sm", c="dimmed"),
-            dmc.Group([dmc.Text(f"{income_change:+.1f}%", size="xl", fw=700, c="green" if income_change >= 0 else "red"),
-                DashIconify(icon="material-symbols:trending-up" if income_change >= 0 else "material-symbols:trending-down", width=24, color="green" if income_change >= 0 else "red")],
-                justify="space-between", align="center"),
-            dmc.Text(f"{format_number(income_old)} → {format_number(income_new)}", size="xs", c="dimmed")], gap="xs")], withBorder=True, shadow="sm", radius="md", p="md"),
-        dmc.Card([dmc.Stack([dmc.Text(f"Return Ratio Change - {selected_type}", size="sm", c="dimmed"),
-            dmc.Group([dmc.Text(f"{ratio_difference:+.2f}%", size="xl", fw=700, c="green" if ratio_difference >= 0 else "red"),
-                DashIconify(icon="material-symbols:trending-up" if ratio_difference >= 0 else "material-symbols:trending-down", width=24, color="green" if ratio_difference >= 0 else "red")],
-                justify="space-between", align="center"),
-            dmc.Text(f"{ratio_old:.2f}% → {ratio_new:.2f}%", size="xs", c="dimmed")], gap="xs")], withBorder=True, shadow="sm", radius="md", p="md"),
+        _delta_card(f"Amount Change - {selected_type}", f"{amount_change:+.1f}%", amount_change >= 0,
+            f"{format_number(amount_old)} → {format_number(amount_new)}"),
+        _delta_card(f"Income Change - {selected_type}", f"{income_change:+.1f}%", income_change >= 0,
+            f"{format_number(income_old)} → {format_number(income_new)}"),
+        _delta_card(f"Return Ratio Change - {selected_type}", f"{ratio_difference:+.2f}%", ratio_difference >= 0,
+            f"{ratio_old:.2f}% → {ratio_new:.2f}%"),
     ], cols=3, spacing="sm", mb="lg")
     
-    def create_comparison_chart(df1, df2, variable, var_label):
-        fig, date_labels = go.Figure(), [date1.strftime('%b-%Y'), date2.strftime('%b-%Y')]
-        if group_var != "none" and group_var in df.columns and group_var in ['Division', 'Type', 'Item', 'Function']:
-            all_categories = set()
-            if not df1.empty: all_categories.update(df1[group_var].unique())
-            if not df2.empty: all_categories.update(df2[group_var].unique())
-            sorted_categories = sorted(all_categories)
-            colors = get_color_sequence('grouped', len(sorted_categories))
-            for i, category in enumerate(sorted_categories):
-                val1 = df1[df1[group_var] == category][variable].sum() if not df1.empty and category in df1[group_var].values else 0
-                val2 = df2[df2[group_var] == category][variable].sum() if not df2.empty and category in df2[group_var].values else 0
-                hover_text = [format_hover_value(val1), format_hover_value(val2)]
-                fig.add_trace(go.Bar(x=date_labels, y=[val1, val2], name=f"{category}",
-                    marker_color=colors[i],
-                    text=[format_number(val1), format_number(val2)], textposition='auto',
-                    customdata=hover_text,
-                    hovertemplate='<b>%{x}</b><br>' + f'{category}<br>' + 'Value: %{customdata}<extra></extra>'))
-            fig.update_layout(barmode='group')
-        elif stack_var != "none" and stack_var in df.columns and stack_var in ['Division', 'Type', 'Item', 'Function']:
-            all_categories = set()
-            if not df1.empty: all_categories.update(df1[stack_var].unique())
-            if not df2.empty: all_categories.update(df2[stack_var].unique())
-            sorted_categories = sorted(all_categories)
-            colors = get_color_sequence('stacked', len(sorted_categories))
-            for i, category in enumerate(sorted_categories):
-                val1 = df1[df1[stack_var] == category][variable].sum() if not df1.empty and category in df1[stack_var].values else 0
-                val2 = df2[df2[stack_var] == category][variable].sum() if not df2.empty and category in df2[stack_var].values else 0
-                hover_text = [format_hover_value(val1), format_hover_value(val2)]
-                fig.add_trace(go.Bar(x=date_labels, y=[val1, val2], name=f"{category}",
-                    marker_color=colors[i],
-                    text=[format_number(val1), format_number(val2)], textposition='auto',
-                    customdata=hover_text,
-                    hovertemplate='<b>%{x}</b><br>' + f'{category}<br>' + 'Value: %{customdata}<extra></extra>'))
-            fig.update_layout(barmode='stack')
-        else:
-            val1 = df1[variable].sum() if not df1.empty else 0
-            val2 = df2[variable].sum() if not df2.empty else 0
-            comparison_colors = get_color_sequence('bar', 2, is_comparison=True)
-            hover_text = [format_hover_value(val1), format_hover_value(val2)]
-            fig.add_trace(go.Bar(x=date_labels, y=[val1, val2], name=var_label,
-                marker_color=comparison_colors, text=[format_number(val1), format_number(val2)], textposition='auto',
-                customdata=hover_text,
-                hovertemplate='<b>%{x}</b><br>Value: %{customdata}<extra></extra>'))
-        
-        all_values = [v for trace in fig.data for v in trace.y if v is not None]
-        max_val = max(all_values) if all_values else 0
-        if max_val >= 1e9:
-            fig.update_yaxes(tickformat=".2s", title_text="Value (Billions)")
-        elif max_val >= 1e6:
-            fig.update_yaxes(tickformat=".2s", title_text="Value (Millions)")
-        elif max_val >= 1e3:
-            fig.update_yaxes(tickformat=".2s", title_text="Value (Thousands)")
-        else:
-            fig.update_yaxes(title_text="Value")
-            
-        fig.update_layout(title=f"{var_label} Comparison - {selected_type}", xaxis_title="Month", 
-            template="plotly_white", height=300, showlegend=True, xaxis=dict(type='category'))
-        return fig
+    key = (selected_type, tuple(sorted(selected_dates)), filter_var, tuple(filter_values or ()))
+    amount_division = _division_chart_cached(*key, amount_col, "Amount")
+    income_division = _division_chart_cached(*key, income_col, "Income")
     
-    def create_division_stacked_chart(df1, df2, variable, var_label):
-        if 'Division' not in df1.columns or 'Division' not in df2.columns:
-            fig = go.Figure()
-            fig.add_annotation(text="Division data not available", xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle', showarrow=False)
-            fig.update_layout(title=f"{var_label} by Division", template="plotly_white", height=350)
-            return fig
-        
-        fig = go.Figure()
-        date_labels = [date1.strftime('%Y-%m'), date2.strftime('%Y-%m')]
-        
-        div1 = df1.groupby('Division')[variable].sum()
-        total1 = div1.sum()
-        pct1 = (div1 / total1 * 100) if total1 > 0 else pd.Series(dtype=float)
-        
-        div2 = df2.groupby('Division')[variable].sum()
-        total2 = div2.sum()
-        pct2 = (div2 / total2 * 100) if total2 > 0 else pd.Series(dtype=float)
-        
-        all_divisions = set()
-        if not pct1.empty: all_divisions.update(pct1.index)
-        if not pct2.empty: all_divisions.update(pct2.index)
-        
-        sorted_divisions = sorted(all_divisions)
-        colors = get_color_sequence('stacked', len(sorted_divisions))
-        for i, division in enumerate(sorted_divisions):
-            p1, p2 = pct1.get(division, 0), pct2.get(division, 0)
-            fig.add_trace(go.Bar(x=date_labels, y=[p1, p2], name=division,
-                marker_color=colors[i],
-                text=[f"{p1:.1f}%", f"{p2:.1f}%"], textposition='inside',
-                hovertemplate='<b>%{x}</b><br>' + f'{division}<br>' + 'Percentage: %{y:.1f}%<extra></extra>'))
-        
-        fig.update_layout(title=f"{var_label} Percentage Contribution by Division - {selected_type}",
-            xaxis_title="Month", yaxis_title="Percentage (%)", barmode='stack', template="plotly_white",
-            height=350, showlegend=True, yaxis=dict(range=[0, 100]))
-        return fig
+    return value_boxes, amount_division, income_division
+
+@callback(
+    [Output("comparison-var1-chart", "figure"), Output("comparison-var2-chart", "figure")],
+    [Input("comparison-type-selector", "value"), Input("comparison-date-selector", "value"), 
+     Input("comparison-filter-selector", "value"), Input("comparison-filter-values-selector", "value"),
+     Input("comparison-stack-selector", "value"), Input("comparison-group-selector", "value")],
+    prevent_initial_call=True
+)
+def update_comparison_var_charts(selected_type, selected_dates, filter_var, filter_values, stack_var, group_var):
+    """Amount and Income two-date bar charts"""
+    slices = get_comparison_slices(selected_type, selected_dates, filter_var, filter_values)
+    if slices is None:
+        empty_fig = create_empty_comparison_figure()
+        return empty_fig, empty_fig
     
-    def create_type2_breakdown_charts(date1, date2, filter_var, filter_values, group_var, selected_type):
-        """Create Type2 breakdown charts showing WW, DP, PP proportions"""
-        type_df1, type_df2, type_group_cols = prepare_type_breakdown_data(date1, date2, filter_var, filter_values, group_var)
-        
-        date_labels = [date1.strftime('%Y-%m'), date2.strftime('%Y-%m')]
-        
-        if type_df1 is None or type_df2 is None:
-            # Return empty figures if data not available
-            empty_fig = go.Figure()
-            empty_fig.add_annotation(text="Type breakdown data not available", xref="paper", yref="paper",
-                x=0.5, y=0.5, xanchor='center', yanchor='middle', showarrow=False)
-            empty_fig.update_layout(template="plotly_white", height=350)
-            return empty_fig, empty_fig
-        
-        # Amount breakdown chart
-        fig_amount = go.Figure()
-        
-        if type_group_cols:
-            # Grouped by category - show side-by-side grouped bars
-            categories = sorted(set(list(type_df1[group_var]) + list(type_df2[group_var])))
-            components = ['WW_Amount', 'DP_Amount', 'PP_Amount']
-            colors_comp = ['#718096', '#E53E3E', '#48BB78']  # Gray, Red, Green
-            
-            for comp_idx, component in enumerate(components):
-                vals_date1 = []
-                vals_date2 = []
-                for cat in categories:
-                    row1 = type_df1[type_df1[group_var] == cat]
-                    row2 = type_df2[type_df2[group_var] == cat]
-                    
-                    total1 = row1[['WW_Amount', 'DP_Amount', 'PP_Amount']].sum().sum() if not row1.empty else 1
-                    total2 = row2[['WW_Amount', 'DP_Amount', 'PP_Amount']].sum().sum() if not row2.empty else 1
-                    
-                    val1 = (row1[component].iloc[0] / total1 * 100) if not row1.empty else 0
-                    val2 = (row2[component].iloc[0] / total2 * 100) if not row2.empty else 0
-                    
-                    vals_date1.append(val1)
-                    vals_date2.append(val2)
-                
-                # Add traces for each date
-                fig_amount.add_trace(go.Bar(
-                    x=[f"{cat} - {date_labels[0]}" for cat in categories],
-                    y=vals_date1,
-                    name=component.replace('_Amount', ''),
-                    marker_color=colors_comp[comp_idx],
-                    text=[f"{v:.1f}%" for v in vals_date1],
-                    textposition='inside',
-                    legendgroup=component,
-                    showlegend=True
-                ))
-                fig_amount.add_trace(go.Bar(
-                    x=[f"{cat} - {date_labels[1]}" for cat in categories],
-                    y=vals_date2,
-                    name=component.replace('_Amount', ''),
-                    marker_color=colors_comp[comp_idx],
-                    text=[f"{v:.1f}%" for v in vals_date2],
-                    textposition='inside',
-                    legendgroup=component,
-                    showlegend=False
-                ))
-            
-            fig_amount.update_layout(barmode='stack')
-        else:
-            # Total view - simple stacked bars
-            row1, row2 = type_df1.iloc[0], type_df2.iloc[0]
-            components = ['WW_Amount', 'DP_Amount', 'PP_Amount']
-            colors_comp = ['#718096', '#E53E3E', '#48BB78']
-            
-            for comp_idx, component in enumerate(components):
-                total1 = row1['WW_Amount'] + row1['DP_Amount'] + row1['PP_Amount']
-                total2 = row2['WW_Amount'] + row2['DP_Amount'] + row2['PP_Amount']
-                
-                pct1 = (row1[component] / total1 * 100) if total1 > 0 else 0
-                pct2 = (row2[component] / total2 * 100) if total2 > 0 else 0
-                
-                fig_amount.add_trace(go.Bar(
-                    x=date_labels,
-                    y=[pct1, pct2],
-                    name=component.replace('_Amount', ''),
-                    marker_color=colors_comp[comp_idx],
-                    text=[f"{pct1:.1f}%", f"{pct2:.1f}%"],
-                    textposition='inside',
-                    hovertemplate='<b>%{x}</b><br>' + component.replace('_Amount', '') + '<br>Percentage: %{y:.1f}%<extra></extra>'
-                ))
-            
-            fig_amount.update_layout(barmode='stack')
-        
-        fig_amount.update_layout(
-            title=f"Amount Breakdown (WW / DP / PP) - {selected_type}",
-            xaxis_title="Period" if not type_group_cols else group_var,
-            yaxis_title="Percentage (%)",
-            template="plotly_white",
-            height=350,
-            showlegend=True,
-            yaxis=dict(range=[0, 100], ticksuffix="%")
-        )
-        
-        # Income breakdown chart (same logic as amount)
-        fig_income = go.Figure()
-        
-        if type_group_cols:
-            categories = sorted(set(list(type_df1[group_var]) + list(type_df2[group_var])))
-            components = ['WW_Income', 'DP_Income', 'PP_Income']
-            colors_comp = ['#718096', '#E53E3E', '#48BB78']
-            
-            for comp_idx, component in enumerate(components):
-                vals_date1 = []
-                vals_date2 = []
-                for cat in categories:
-                    row1 = type_df1[type_df1[group_var] == cat]
-                    row2 = type_df2[type_df2[group_var] == cat]
-                    
-                    total1 = row1[['WW_Income', 'DP_Income', 'PP_Income']].sum().sum() if not row1.empty else 1
-                    total2 = row2[['WW_Income', 'DP_Income', 'PP_Income']].sum().sum() if not row2.empty else 1
-                    
-                    val1 = (row1[component].iloc[0] / total1 * 100) if not row1.empty else 0
-                    val2 = (row2[component].iloc[0] / total2 * 100) if not row2.empty else 0
-                    
-                    vals_date1.append(val1)
-                    vals_date2.append(val2)
-                
-                fig_income.add_trace(go.Bar(
-                    x=[f"{cat} - {date_labels[0]}" for cat in categories],
-                    y=vals_date1,
-                    name=component.replace('_Income', ''),
-                    marker_color=colors_comp[comp_idx],
-                    text=[f"{v:.1f}%" for v in vals_date1],
-                    textposition='inside',
-                    legendgroup=component,
-                    showlegend=True
-                ))
-                fig_income.add_trace(go.Bar(
-                    x=[f"{cat} - {date_labels[1]}" for cat in categories],
-                    y=vals_date2,
-                    name=component.replace('_Income', ''),
-                    marker_color=colors_comp[comp_idx],
-                    text=[f"{v:.1f}%" for v in vals_date2],
-                    textposition='inside',
-                    legendgroup=component,
-                    showlegend=False
-                ))
-            
-            fig_income.update_layout(barmode='stack')
-        else:
-            row1, row2 = type_df1.iloc[0], type_df2.iloc[0]
-            components = ['WW_Income', 'DP_Income', 'PP_Income']
-            colors_comp = ['#718096', '#E53E3E', '#48BB78']
-            
-            for comp_idx, component in enumerate(components):
-                total1 = row1['WW_Income'] + row1['DP_Income'] + row1['PP_Income']
-                total2 = row2['WW_Income'] + row2['DP_Income'] + row2['PP_Income']
-                
-                pct1 = (row1[component] / total1 * 100) if total1 > 0 else 0
-                pct2 = (row2[component] / total2 * 100) if total2 > 0 else 0
-                
-                fig_income.add_trace(go.Bar(
-                    x=date_labels,
-                    y=[pct1, pct2],
-                    name=component.replace('_Income', ''),
-                    marker_color=colors_comp[comp_idx],
-                    text=[f"{pct1:.1f}%", f"{pct2:.1f}%"],
-                    textposition='inside',
-                    hovertemplate='<b>%{x}</b><br>' + component.replace('_Income', '') + '<br>Percentage: %{y:.1f}%<extra></extra>'
-                ))
-            
-            fig_income.update_layout(barmode='stack')
-        
-        fig_income.update_layout(
-            title=f"Income Breakdown (WW / DP / PP) - {selected_type}",
-            xaxis_title="Period" if not type_group_cols else group_var,
-            yaxis_title="Percentage (%)",
-            template="plotly_white",
-            height=350,
-            showlegend=True,
-            yaxis=dict(range=[0, 100], ticksuffix="%")
-        )
-        
-        return fig_amount, fig_income
+    amount_col, income_col = get_comparison_columns(selected_type)
+    category_col, barmode = get_comparison_category(group_var, stack_var)
+    key = (selected_type, tuple(sorted(selected_dates)), filter_var, tuple(filter_values or ()))
+    amount_chart = _comparison_chart_cached(*key, category_col, barmode, amount_col, "Amount")
+    income_chart = _comparison_chart_cached(*key, category_col, barmode, income_col, "Income")
+    return amount_chart, income_chart
+
+@callback(
+    [Output("var1-dumbbell-chart", "figure"), Output("var2-dumbbell-chart", "figure"),
+     Output("type2-amount-chart", "figure"), Output("type2-income-chart", "figure")],
+    [Input("comparison-type-selector", "value"), Input("comparison-date-selector", "value"), 
+     Input("comparison-filter-selector", "value"), Input("comparison-filter-values-selector", "value"),
+     Input("comparison-group-selector", "value")],
+    prevent_initial_call=True
+)
+def update_dumbbell_charts(selected_type, selected_dates, filter_var, filter_values, group_var):
+    """Proportion dumbbells and Type 2 (WW / DP / PP) breakdown charts (independent of the stack selector)"""
+    slices = get_comparison_slices(selected_type, selected_dates, filter_var, filter_values)
+    if slices is None:
+        empty_fig = create_empty_comparison_figure()
+        return empty_fig, empty_fig, empty_fig, empty_fig
     
-    amount_chart = create_comparison_chart(df_date1, df_date2, amount_col, "Amount")
-    income_chart = create_comparison_chart(df_date1, df_date2, income_col, "Income")
-    amount_dumbbell = create_dumbbell_chart_updated(df_date1, df_date2, amount_col, date1, date2, group_var, selected_type, "Amount")
-    income_dumbbell = create_dumbbell_chart_updated(df_date1, df_date2, income_col, date1, date2, group_var, selected_type, "Income")
-    amount_division = create_division_stacked_chart(df_date1, df_date2, amount_col, "Amount")
-    income_division = create_division_stacked_chart(df_date1, df_date2, income_col, "Income")
+    amount_col, income_col = get_comparison_columns(selected_type)
+    # Dumbbells fall back to Function; the aggregate is shared with any other chart grouped the same way
+    dumbbell_group = group_var if group_var != "none" else "Function"
+    key = (selected_type, tuple(sorted(selected_dates)), filter_var, tuple(filter_values or ()))
+    amount_dumbbell = _dumbbell_chart_cached(*key, dumbbell_group, amount_col, "Amount")
+    income_dumbbell = _dumbbell_chart_cached(*key, dumbbell_group, income_col, "Income")
     
     # Create Type2 breakdown charts (WW, DP, PP)
-    type2_amount_chart, type2_income_chart = create_type2_breakdown_charts(date1, date2, filter_var, filter_values, group_var, selected_type)
+    type2_amount_chart, type2_income_chart = _type2_breakdown_charts_cached(*key, group_var)
     
-    return value_boxes, amount_chart, income_chart, amount_dumbbell, income_dumbbell, amount_division, income_division, type2_amount_chart, type2_income_chart, comparison_text
+    return amount_dumbbell, income_dumbbell, type2_amount_chart, type2_income_chart
+
+# Shown until exactly two dates are selected; a short constant shared by the pre-rendered layout and the callback
+_COMPARISON_TEXT_PROMPT = "Comparison Analysis:\n\n• Select exactly 2 dates to compare data\n• Use filters and grouping to focus analysis"
+
+@callback(
+    Output("comparison-textbox", "value"),
+    [Input("comparison-type-selector", "value"), Input("comparison-date-selector", "value"), 
+     Input("comparison-filter-selector", "value"), Input("comparison-filter-values-selector", "value"),
+     Input("comparison-group-selector", "value")],
+    prevent_initial_call=True
+)
+def update_comparison_text(selected_type, selected_dates, filter_var, filter_values, group_var):
+    """Generated comparison analysis text (independent of the stack selector)"""
+    if not selected_dates or len(selected_dates) != 2:
+        return _COMPARISON_TEXT_PROMPT
+    return _comparison_text_cached(selected_type, tuple(sorted(selected_dates)), filter_var, tuple(filter_values or ()), group_var)
+
+@functools.lru_cache(maxsize=64)
+def _comparison_text_cached(selected_type, selected_dates, filter_var, filter_values, group_var):
+    """Comparison analysis text memoised on the normalised selection; the data is loaded once at import"""
+    date1, date2, df_date1, df_date2 = _get_comparison_slices_cached(selected_type, selected_dates, filter_var, filter_values)
+    amount_col, income_col = get_comparison_columns(selected_type)
+    amount_old, amount_new, income_old, income_new = get_comparison_totals(date1, date2, amount_col, income_col, filter_var, list(filter_values))
+    return generate_enhanced_comparison_text_updated(amount_old, amount_new, income_old, income_new, date1, date2,
+        filter_var, list(filter_values), group_var, df_date1, df_date2, selected_type, amount_col, income_col,
+        comparison_agg=functools.partial(_get_comparison_aggregate_cached, selected_type, selected_dates, filter_var, filter_values))
 
 @callback(Output("download-dataframe-xlsx", "data"), Input("export-excel-btn", "n_clicks"),
     [State("comparison-type-selector", "value"), State("comparison-date-selector", "value"),
@@ -1407,17 +1754,8 @@ def export_comparison_excel(n_clicks, selected_type, selected_dates, filter_var,
     """Export all comparison chart data to multi-sheet Excel"""
     if n_clicks and selected_dates and len(selected_dates) == 2:
         import io
-        date1, date2 = sorted([pd.to_datetime(date + '-01') for date in selected_dates])
-        df = sample_data.copy()
-        
-        # Filter by dates
-        df_date1 = df[df['date'].dt.to_period('M') == date1.to_period('M')].copy()
-        df_date2 = df[df['date'].dt.to_period('M') == date2.to_period('M')].copy()
-        
-        # Apply filters
-        if filter_var != "none" and filter_var in df.columns and filter_values:
-            df_date1 = df_date1[df_date1[filter_var].isin(filter_values)]
-            df_date2 = df_date2[df_date2[filter_var].isin(filter_values)]
+        # Filtered monthly partitions shared with the comparison charts (read-only here)
+        date1, date2, df_date1, df_date2 = get_comparison_slices(selected_type, selected_dates, filter_var, filter_values)
         
         # Create Excel file with multiple sheets
         output = io.BytesIO()
@@ -1426,51 +1764,56 @@ def export_comparison_excel(n_clicks, selected_type, selected_dates, filter_var,
             amount_col = f'Amount_{selected_type}' if selected_type != 'Total' else 'Amount_total'
             income_col = f'Income_{selected_type}' if selected_type != 'Total' else 'Income_total'
             
+            # One column-wise numpy reduction per month yields both totals
+            totals1 = df_date1[[amount_col, income_col]].to_numpy().sum(axis=0)
+            totals2 = df_date2[[amount_col, income_col]].to_numpy().sum(axis=0)
             summary_data = pd.DataFrame({
                 'Date': [date1.strftime('%Y-%m'), date2.strftime('%Y-%m')],
-                'Amount': [df_date1[amount_col].sum(), df_date2[amount_col].sum()],
-                'Income': [df_date1[income_col].sum(), df_date2[income_col].sum()]
+                'Amount': [totals1[0], totals2[0]],
+                'Income': [totals1[1], totals2[1]]
             })
             summary_data.to_excel(writer, sheet_name='Summary', index=False)
             
             # Sheet 2: By group/stack variable if selected
             group_col = None
-            if group_var != "none" and group_var in ['Division', 'Type', 'Item', 'Function']:
+            if group_var in _VALID_GROUPS:
                 group_col = group_var
-            elif stack_var != "none" and stack_var in ['Division', 'Type', 'Item', 'Function']:
+            elif stack_var in _VALID_GROUPS:
                 group_col = stack_var
             
-            if group_col and group_col in df.columns:
+            if group_col and group_col in df_date1.columns:
                 group_data = []
                 for date, df_temp in [(date1, df_date1), (date2, df_date2)]:
-                    for cat in df_temp[group_col].unique():
-                        cat_df = df_temp[df_temp[group_col] == cat]
+                    cat_rows = df_temp.groupby(group_col, sort=False, observed=True).indices
+                    amounts, incomes = df_temp[amount_col].to_numpy(), df_temp[income_col].to_numpy()
+                    for cat, rows in cat_rows.items():
                         group_data.append({
                             'Date': date.strftime('%b-%Y'),
                             group_col: cat,
-                            'Amount': cat_df[amount_col].sum(),
-                            'Income': cat_df[income_col].sum()
+                            'Amount': amounts.take(rows).sum(),
+                            'Income': incomes.take(rows).sum()
                         })
                 pd.DataFrame(group_data).to_excel(writer, sheet_name=f'By {group_col}', index=False)
             
             # Sheet 3: Division breakdown if available and not already exported
-            if 'Division' in df.columns and group_col != 'Division':
+            if 'Division' in df_date1.columns and group_col != 'Division':
                 div_data = []
                 for date, df_temp in [(date1, df_date1), (date2, df_date2)]:
-                    for div in df_temp['Division'].unique():
-                        div_df = df_temp[df_temp['Division'] == div]
+                    div_rows = df_temp.groupby('Division', sort=False, observed=True).indices
+                    amounts, incomes = df_temp[amount_col].to_numpy(), df_temp[income_col].to_numpy()
+                    for div, rows in div_rows.items():
                         div_data.append({
                             'Date': date.strftime('%Y-%m'),
                             'Division': div,
-                            'Amount': div_df[amount_col].sum(),
-                            'Income': div_df[income_col].sum()
+                            'Amount': amounts.take(rows).sum(),
+                            'Income': incomes.take(rows).sum()
                         })
                 pd.DataFrame(div_data).to_excel(writer, sheet_name='By Division', index=False)
             
             # Sheet 4: Tool sample data if available
             try:
-                tool_date1 = tool_sample[tool_sample['date'] == date1].copy()
-                tool_date2 = tool_sample[tool_sample['date'] == date2].copy()
+                tool_date1 = rows_for_date(tool_sample, date1)
+                tool_date2 = rows_for_date(tool_sample, date2)
                 if filter_var != "none" and filter_values and filter_var in tool_date1.columns:
                     tool_date1 = tool_date1[tool_date1[filter_var].isin(filter_values)]
                     tool_date2 = tool_date2[tool_date2[filter_var].isin(filter_values)]
@@ -1492,7 +1835,7 @@ def export_history_data(n_clicks, selected_type, year_range, filter_var, filter_
     """Export all History tab chart data to multi-sheet Excel"""
     if n_clicks:
         import io
-        df = sample_data.copy()
+        df = rows_for_years(sample_data, year_range)
         
         # Create Best columns if needed
         if selected_type == "Best":
@@ -1500,7 +1843,6 @@ def export_history_data(n_clicks, selected_type, year_range, filter_var, filter_
             df['Income_Best'] = df['Income_1'] + df['Income_2']
         
         # Apply filters
-        df = df[(df['date'].dt.year >= year_range[0]) & (df['date'].dt.year <= year_range[1])]
         if filter_var != "none" and filter_var in df.columns and filter_values:
             df = df[df[filter_var].isin(filter_values)]
         
@@ -1509,44 +1851,32 @@ def export_history_data(n_clicks, selected_type, year_range, filter_var, filter_
         
         # Determine grouping column for export
         group_col = None
-        if stack_var != "none" and stack_var in ['Division', 'Type', 'Item', 'Function']:
+        if stack_var in _VALID_GROUPS:
             group_col = stack_var
-        elif group_var != "none" and group_var in ['Division', 'Type', 'Item', 'Function']:
+        elif group_var in _VALID_GROUPS:
             group_col = group_var
         
+        # One monthly aggregation feeds all three sheets, keyed by the precomputed 'YYYY-MM' labels
+        keys = [_MONTH_KEY.loc[df.index], group_col] if group_col else [_MONTH_KEY.loc[df.index]]
+        label_cols = ['Month', group_col] if group_col else ['Month']
+        monthly = df.groupby(keys, observed=True)[[amount_col, income_col]].sum().reset_index()
+        
         # Create Excel with multiple sheets
         output = io.BytesIO()
         with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
             # Sheet 1: Amount chart data
-            if group_col:
-                amount_data = df.groupby([df['date'].dt.to_period('M'), group_col])[amount_col].sum().reset_index()
-                amount_data.columns = ['Month', group_col, 'Amount']
-            else:
-                amount_data = df.groupby(df['date'].dt.to_period('M'))[amount_col].sum().reset_index()
-                amount_data.columns = ['Month', 'Amount']
-            amount_data['Month'] = amount_data['Month'].astype(str)
+            amount_data = monthly.drop(columns=income_col)
+            amount_data.columns = label_cols + ['Amount']
             amount_data.to_excel(writer, sheet_name='Amount Chart', index=False)
             
             # Sheet 2: Income chart data
-            if group_col:
-                income_data = df.groupby([df['date'].dt.to_period('M'), group_col])[income_col].sum().reset_index()
-                income_data.columns = ['Month', group_col, 'Income']
-            else:
-                income_data = df.groupby(df['date'].dt.to_period('M'))[income_col].sum().reset_index()
-                income_data.columns = ['Month', 'Income']
-            income_data['Month'] = income_data['Month'].astype(str)
+            income_data = monthly.drop(columns=amount_col)
+            income_data.columns = label_cols + ['Income']
             income_data.to_excel(writer, sheet_name='Income Chart', index=False)
             
             # Sheet 3: Ratio chart data
-            if group_col:
-                ratio_data = df.groupby([df['date'].dt.to_period('M'), group_col]).agg({amount_col: 'sum', income_col: 'sum'}).reset_index()
-                ratio_data['Ratio'] = (ratio_data[income_col] / ratio_data[amount_col].replace(0, np.nan)) * 100
-                ratio_data.columns = ['Month', group_col, 'Amount', 'Income', 'Ratio (%)']
-            else:
-                ratio_data = df.groupby(df['date'].dt.to_period('M')).agg({amount_col: 'sum', income_col: 'sum'}).reset_index()
-                ratio_data['Ratio'] = (ratio_data[income_col] / ratio_data[amount_col].replace(0, np.nan)) * 100
-                ratio_data.columns = ['Month', 'Amount', 'Income', 'Ratio (%)']
-            ratio_data['Month'] = ratio_data['Month'].astype(str)
+            ratio_data = monthly.assign(Ratio=(monthly[income_col] / monthly[amount_col].replace(0, np.nan)) * 100)
+            ratio_data.columns = label_cols + ['Amount', 'Income', 'Ratio (%)']
             ratio_data.to_excel(writer, sheet_name='Ratio Chart', index=False)
             
         
@@ -1637,105 +1967,58 @@ def export_tool_data(n_clicks, division_filter, item_filter, function_filter, ye
     if n_clicks:
         import io
         
-        # Filter main data
-        df_main = sample_data.copy()
-        df_main = df_main[(df_main['date'].dt.year >= year_range[0]) & (df_main['date'].dt.year <= year_range[1])]
-        if division_filter != "none":
-            df_main = df_main[df_main['Division'] == division_filter]
-        if item_filter != "none":
-            df_main = df_main[df_main['Item'] == item_filter]
-        if function_filter != "none":
-            df_main = df_main[df_main['Function'] == function_filter]
-        
-        # Filter tool data
-        df_corr = tool_sample.copy()
-        df_corr = df_corr[(df_corr['date'].dt.year >= year_range[0]) & (df_corr['date'].dt.year <= year_range[1])]
-        if division_filter != "none":
-            df_corr = df_corr[df_corr['Division'] == division_filter]
-        if item_filter != "none":
-            df_corr = df_corr[df_corr['Item'] == item_filter]
-        if function_filter != "none":
-            df_corr = df_corr[df_corr['Function'] == function_filter]
+        # Same filtered monthly aggregates the chart was drawn from (usually already cached)
+        main_agg, corr_agg, merged = get_tool_monthly(division_filter, item_filter, function_filter, year_range)
         
         # Create Excel with multiple sheets
         output = io.BytesIO()
         with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
             # Sheet 1: Original Income
-            main_agg = df_main.groupby('date')['Income_total'].sum().reset_index()
-            main_agg['month'] = main_agg['date'].dt.to_period('M').astype(str)
             main_agg[['month', 'Income_total']].to_excel(writer, sheet_name='Original Income', index=False)
             
             # Sheet 2: Income Corrections
-            corr_agg = df_corr.groupby('date')['Income_corr'].sum().reset_index()
-            corr_agg['month'] = corr_agg['date'].dt.to_period('M').astype(str)
             corr_agg[['month', 'Income_corr']].to_excel(writer, sheet_name='Income Corrections', index=False)
             
             # Sheet 3: Combined view
-            merged = pd.merge(main_agg[['month', 'Income_total']], corr_agg[['month', 'Income_corr']], 
-                             on='month', how='outer').fillna(0)
-            merged['Total_with_Correction'] = merged['Income_total'] + merged['Income_corr']
-            merged.to_excel(writer, sheet_name='Combined', index=False)
+            merged.assign(Total_with_Correction=merged['Income_total'] + merged['Income_corr']).to_excel(
+                writer, sheet_name='Combined', index=False)
             
         
         output.seek(0)
         return dcc.send_bytes(output.getvalue(), f"tool_data_{datetime.now().strftime('%Y%m%d')}.xlsx")
 
 
-@callback(Output("generate-summary-btn", "children"), Input("generate-summary-btn", "n_clicks"), 
-    State("events-textbox", "value"), prevent_initial_call=True)
-def generate_summary(n_clicks, events_text):
-    return "Summary Generated!" if n_clicks else "Generate Summary"
+# Confirmation labels for the summary/save buttons; the textbox contents are not read, so they are not sent as State
+_SUMMARY_GENERATED = "Summary Generated!"
+_COMPARISON_SAVED = "Comparison Saved!"
+
+@callback(Output("generate-summary-btn", "children"), Input("generate-summary-btn", "n_clicks"), prevent_initial_call=True)
+def generate_summary(n_clicks):
+    return _SUMMARY_GENERATED if n_clicks else dash.no_update
 
-@callback(Output("save-comparison-btn", "children"), Input("save-comparison-btn", "n_clicks"), 
-    State("comparison-textbox", "value"), prevent_initial_call=True)
-def save_comparison(n_clicks, comparison_text):
-    return "Comparison Saved!" if n_clicks else "Save Comparison"
+@callback(Output("save-comparison-btn", "children"), Input("save-comparison-btn", "n_clicks"), prevent_initial_call=True)
+def save_comparison(n_clicks):
+    return _COMPARISON_SAVED if n_clicks else dash.no_update
 
 @callback(
     Output("tool-income-chart", "figure"),
     [Input("tool-division-filter", "value"), Input("tool-item-filter", "value"), 
-     Input("tool-function-filter", "value"), Input("tool-year-range-slider", "value")]
+     Input("tool-function-filter", "value"), Input("tool-year-range-slider", "value")],
+    prevent_initial_call=True
 )
 def update_tool_chart(division_filter, item_filter, function_filter, year_range):
-    # Filter sample_data
-    df_main = sample_data.copy()
-    df_main = df_main[(df_main['date'].dt.year >= year_range[0]) & (df_main['date'].dt.year <= year_range[1])]
-    if division_filter != "none":
-        df_main = df_main[df_main['Division'] == division_filter]
-    if item_filter != "none":
-        df_main = df_main[df_main['Item'] == item_filter]
-    if function_filter != "none":
-        df_main = df_main[df_main['Function'] == function_filter]
-    
-    # Filter tool_sample
-    df_corr = tool_sample.copy()
-    df_corr = df_corr[(df_corr['date'].dt.year >= year_range[0]) & (df_corr['date'].dt.year <= year_range[1])]
-    if division_filter != "none":
-        df_corr = df_corr[df_corr['Division'] == division_filter]
-    if item_filter != "none":
-        df_corr = df_corr[df_corr['Item'] == item_filter]
-    if function_filter != "none":
-        df_corr = df_corr[df_corr['Function'] == function_filter]
-    
-    # Aggregate by date
-    main_agg = df_main.groupby('date')['Income_total'].sum().reset_index()
-    main_agg['month'] = main_agg['date'].dt.to_period('M').astype(str)
-    
-    corr_agg = df_corr.groupby('date')['Income_corr'].sum().reset_index()
-    corr_agg['month'] = corr_agg['date'].dt.to_period('M').astype(str)
-    
-    # Merge the two datasets
-    merged = pd.merge(main_agg[['month', 'Income_total']], corr_agg[['month', 'Income_corr']], 
-                     on='month', how='outer').fillna(0)
-    merged = merged.sort_values('month')
-    
-    # Create stacked bar chart
-    fig = go.Figure()
+    return _tool_chart_cached(division_filter, item_filter, function_filter, tuple(year_range))
+
+@functools.lru_cache(maxsize=32)
+def _tool_chart_cached(division_filter, item_filter, function_filter, year_range):
+    """Tool income chart memoised on the selection, stored as a plain figure dict"""
+    merged = get_tool_monthly(division_filter, item_filter, function_filter, year_range)[2]
     
     # Format dates for hover
     hover_dates = [pd.to_datetime(str(m)).strftime('%b-%Y') for m in merged['month']]
     
-    fig.add_trace(go.Bar(
+    # Stacked bar chart: original income with the corrections on top
+    traces = [go.Bar(
         x=merged['month'],
         y=merged['Income_total'],
         name='Income Total (Original)',
@@ -1744,9 +2027,7 @@ def update_tool_chart(division_filter, item_filter, function_filter, year_range)
         textposition='inside',
         customdata=list(zip(hover_dates, [format_hover_value(v) for v in merged['Income_total']])),
         hovertemplate='<b>%{customdata[0]}</b><br>Income Total (Original)<br>Value: %{customdata[1]}<extra></extra>'
-    ))
-    
-    fig.add_trace(go.Bar(
+    ), go.Bar(
         x=merged['month'],
         y=merged['Income_corr'],
         name='Income Correction',
@@ -1755,72 +2036,65 @@ def update_tool_chart(division_filter, item_filter, function_filter, year_range)
         textposition='inside',
         customdata=list(zip(hover_dates, [format_hover_value(v) for v in merged['Income_corr']])),
         hovertemplate='<b>%{customdata[0]}</b><br>Income Correction<br>Value: %{customdata[1]}<extra></extra>'
-    ))
+    )]
     
     # Format y-axis
     all_values = list(merged['Income_total']) + list(merged['Income_corr'])
     max_val = max(all_values) if all_values else 0
     
     if max_val >= 1e9:
-        fig.update_yaxes(tickformat=".2s", title_text="Income (Billions)")
+        yaxis = dict(tickformat=".2s", title="Income (Billions)")
     elif max_val >= 1e6:
-        fig.update_yaxes(tickformat=".2s", title_text="Income (Millions)")
+        yaxis = dict(tickformat=".2s", title="Income (Millions)")
     elif max_val >= 1e3:
-        fig.update_yaxes(tickformat=".2s", title_text="Income (Thousands)")
+        yaxis = dict(tickformat=".2s", title="Income (Thousands)")
     else:
-        fig.update_yaxes(title_text="Income")
+        yaxis = dict(title="Income")
     
-    fig.update_layout(
+    # Traces and layout go through one constructor, so the figure is validated once instead of per add/update call
+    fig = go.Figure(data=traces, layout=dict(
         title="Income Analysis: Original vs Corrected",
-        xaxis_title="Month",
+        xaxis=dict(title="Month", tickangle=45),
+        yaxis=yaxis,
         barmode='stack',
         template="plotly_white",
         height=500,
         showlegend=True,
         margin=dict(l=50, r=50, t=60, b=50)
-    )
-    fig.update_xaxes(tickangle=45)
+    ))
     
-    return fig
+    return plain_figure(fig)
 
 @callback(
     Output("scenario-weight-chart", "figure"),
-    [Input("scenario-year-range-slider", "value")]
+    [Input("scenario-year-range-slider", "value")],
+    prevent_initial_call=True
 )
 def update_scenario_weight_chart(year_range):
     """Create stacked bar chart showing scenario weight percentages by date"""
+    return _scenario_weight_chart_cached(tuple(year_range) if year_range is not None else None)
+
+@functools.lru_cache(maxsize=16)
+def _scenario_weight_chart_cached(year_range):
+    """Scenario weight chart memoised on the year range, stored as a plain figure dict"""
     try:
-        df = scenw_sample.copy()
-        
-        # Handle None year_range (initial load)
-        if year_range is None:
-            year_range = [df['date'].dt.year.min(), df['date'].dt.year.max()]
-        
-        # Filter by year range
-        df = df[(df['date'].dt.year >= year_range[0]) & (df['date'].dt.year <= year_range[1])]
-        
-        # Prepare data
-        df['month'] = df['date'].dt.to_period('M').astype(str)
-        
-        # Aggregate weights by month and scenario (in case of duplicates)
-        df_agg = df.groupby(['month', 'ScenName'])['Weight'].sum().reset_index()
-        
-        # Pivot to get scenario weights by month
-        pivot_df = df_agg.pivot(index='month', columns='ScenName', values='Weight').fillna(0)
+        # Filter the precomputed (month, scenario) sums by year range (None on initial load keeps every month)
+        monthly_weights = _SCENARIO_WEIGHTS
+        if year_range is not None:
+            years = monthly_weights.index.get_level_values('month').str[:4].astype(int)
+            monthly_weights = monthly_weights[(years >= year_range[0]) & (years <= year_range[1])]
         
-        # Sort by month
-        pivot_df = pivot_df.sort_index()
+        # Pivot to get scenario weights by month (months come out sorted)
+        pivot_df = monthly_weights.unstack('ScenName', fill_value=0)
         
         # Get unique scenarios
-        unique_scenarios = sorted(df['ScenName'].unique())
-        
-        # Create figure
-        fig = go.Figure()
+        unique_scenarios = sorted(pivot_df.columns)
         
         # Get color sequence for scenarios
         colors = get_color_sequence('stacked', len(unique_scenarios))
         
-        # Add traces for each scenario
+        # One trace per scenario, handed to the figure constructor together with the layout
+        traces = []
         for i, scenario in enumerate(unique_scenarios):
             if scenario in pivot_df.columns:
                 weights = pivot_df[scenario]
@@ -1831,7 +2105,7 @@ def update_scenario_weight_chart(year_range):
                 # Format dates for hover
                 hover_dates = [pd.to_datetime(str(m)).strftime('%b-%Y') for m in pivot_df.index]
                 
-                fig.add_trace(go.Bar(
+                traces.append(go.Bar(
                     x=pivot_df.index,
                     y=weight_pct,
                     name=scenario,
@@ -1843,8 +2117,7 @@ def update_scenario_weight_chart(year_range):
                     hovertemplate='<b>%{customdata[0]}</b><br>' + f'{scenario}<br>' + 
                                  'Weight: %{customdata[1]:.2f}%<extra></extra>'
                 ))
-        
-        fig.update_layout(
+        fig = go.Figure(data=traces, layout=dict(
             title="Scenario Weight Distribution Over Time",
             xaxis_title="Month",
             yaxis_title="Weight (%)",
@@ -1862,9 +2135,9 @@ def update_scenario_weight_chart(year_range):
             margin=dict(l=50, r=150, t=60, b=100),
             yaxis=dict(range=[0, 100], ticksuffix="%"),
             xaxis=dict(type='category', tickangle=45)
-        )
+        ))
         
-        return fig
+        return plain_figure(fig)
         
     except Exception as e:
         # Return error figure if anything goes wrong
@@ -1874,7 +2147,7 @@ def update_scenario_weight_chart(year_range):
                           xanchor='center', yanchor='middle', showarrow=False,
                           font=dict(size=12, color="red"))
         fig.update_layout(title="Scenario Weight Distribution Over Time", template="plotly_white", height=500)
-        return fig
+        return plain_figure(fig)
 
 @callback(Output("download-scenario-data", "data"), Input("scenario-export-btn", "n_clicks"),
     [State("scenario-year-range-slider", "value")], prevent_initial_call=True)
@@ -1883,9 +2156,8 @@ def export_scenario_data(n_clicks, year_range):
     if n_clicks:
         import io
         
-        df = scenw_sample.copy()
-        df = df[(df['date'].dt.year >= year_range[0]) & (df['date'].dt.year <= year_range[1])]
-        df['month'] = df['date'].dt.to_period('M').astype(str)
+        df = rows_for_years(scenw_sample, year_range)
+        df['month'] = _SCENW_MONTH_KEY.loc[df.index]
         
         # Create pivot table for easier reading
         pivot_data = df.pivot_table(index='month', columns='Scenario_name', 
@@ -1920,6 +2192,42 @@ def export_scenario_png(n_clicks, fig_data):
         zip_buffer.seek(0)
         return dcc.send_bytes(zip_buffer.getvalue(), f"scenario_chart_{datetime.now().strftime('%Y%m%d')}.zip")
 
+# ============================================================================
+# LAYOUT REGISTRATION
+# ============================================================================
+@functools.cache
+def _initial_outputs():
+    """Callback outputs for the layout's default control values, rendered into the layout so the page loads
+    without firing those callbacks"""
+    years = [min_year, max_year]
+    outputs = dict(zip(["amount-barchart", "income-barchart", "ratio-chart"], update_barcharts("Total", "none", [], "none", "none", years)))
+    outputs["history-summary-boxes"] = update_history_summary("Total", "none", [], years)
+    outputs.update(zip(["comparison-value-boxes", "amount-division-chart", "income-division-chart"],
+        update_comparison_value_boxes("Total", [], "none", [])))
+    outputs.update(zip(["comparison-var1-chart", "comparison-var2-chart"], update_comparison_var_charts("Total", [], "none", [], "none", "none")))
+    outputs.update(zip(["var1-dumbbell-chart", "var2-dumbbell-chart", "type2-amount-chart", "type2-income-chart"],
+        update_dumbbell_charts("Total", [], "none", [], "none")))
+    outputs["comparison-textbox"] = update_comparison_text("Total", [], "none", [], "none")
+    outputs["tool-income-chart"] = update_tool_chart("none", "none", "none", years)
+    outputs["scenario-weight-chart"] = update_scenario_weight_chart(years)
+    return outputs
+
+
+app.layout = serve_layout
+
+
+@functools.lru_cache(maxsize=1)
+def _layout_json(last_updated):
+    """Serialized layout for one header minute; only the timestamp varies, so page loads within it reuse the bytes"""
+    return to_json_plotly(serve_layout())
+
+
+@server.before_request
+def _serve_cached_layout():
+    """Answer /_dash-layout from the per-minute cache instead of rebuilding and re-encoding the tree"""
+    if flask.request.path == app.config.routes_pathname_prefix + '_dash-layout':
+        return flask.Response(_layout_json(datetime.now().strftime('%Y-%m-%d %H:%M')), mimetype='application/json')
+
 # ============================================================================
 # RUN APP
 # ============================================================================